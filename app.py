@@ -1,17 +1,41 @@
 # app_topcombo_master_detail.py
 # 좌: 카테고리 차트 / 우: KPI(가로 카드)
-# 목록: 마스터/디테일(행 클릭으로 상세 펼침)
+# 목록: 마스터/디테일(행 클릭 시 상세 원문을 id로 조회해 펼침)
 # 날짜: 시작/종료일 개별 입력
 # created_at / updated_at 숨김
 # 차트: 색상+라벨, 총건수 강조 + 플랫폼별 KPI(레진/발코니/델리툰)
+# 무거운 모듈(altair/st_aggrid)과 관리 섹션 전용 모듈(내보내기/삭제/업로드/마이그레이션)은 쓰는 곳에서 import
+
+import time
+T_START = time.perf_counter()   # 실행 시작 (프로세스 첫 실행은 import 시간 포함)
 
 import os
+import functools
+import html
+import importlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import pandas as pd
-import altair as alt
 import streamlit as st
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine, text
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, JsCode
+from sqlalchemy import create_engine, inspect, text
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from dbpool import checkout, connect, instrument_pool, ping_idle, pool_options, pool_stats
+from importer import content_keys, duration_minutes, has_content_key, has_duration_minutes
+from profiling import (current_run, end_run, instrument_engine, lap, profiled, records, start_run, summarize,
+                       to_jsonl, use_run)
+from queries import (build_filters, fill_buckets, has_soft_delete, impact_by, impact_totals, keyword_clause, run_catalog,
+                     run_detail, run_impact, run_list, run_page, run_summary, run_trend, trend_bucket, where_sqls)
+from rollup import ensure_rollup, rebuild_daily, rebuild_dims, refresh_daily, rollup_complete
+from schema import DIMS_DDL, INDEXES, ROLLUP_DDL, fulltext_ddl, fulltext_token_size, missing_indexes, plan_warnings
+from snapshot import (DEFAULT_PATH as SNAPSHOT_PATH, is_stale, open_snapshot, snap_list, snap_page, snap_summary,
+                      snap_trend, snapshot_available, sync_if_stale)
+from swr import cache_stats, clear as swr_clear, freeze, get as swr_get, open_cache
+
+log = logging.getLogger("errorlog")
 
 # ---------------------------
 # 페이지 설정 + 상단 타이틀(작게)
@@ -55,6 +79,7 @@ def get_engine():
         pw   = cfg.get("DB_PASSWORD") or cfg.get("PASSWORD")
         name = cfg.get("DB_NAME") or cfg.get("NAME")
     else:
+        cfg  = None
         host = os.getenv("DB_HOST"); port = int(os.getenv("DB_PORT") or 3306)
         user = os.getenv("DB_USER"); pw = os.getenv("DB_PASSWORD"); name = os.getenv("DB_NAME")
 
@@ -64,105 +89,481 @@ def get_engine():
 
     url = f"mysql+pymysql://{user}:{pw}@{host}:{port}/{name}?charset=utf8mb4"
     connect_args = {"ssl": {"ssl": True}}
-    eng = create_engine(url, pool_pre_ping=True, connect_args=connect_args)
-    with eng.connect() as conn:
-        conn.execute(text("SELECT 1"))
-    return eng
+    eng = create_engine(url, connect_args=connect_args, **pool_options(cfg))   # 연결은 engine_probe에서
+    instrument_pool(eng, ping_idle(cfg))
+    return instrument_engine(eng)
+
+# ---------------------------
+# 동시 실행: 서로 독립인 쿼리(요약/목록)를 풀 스레드에서 동시에 보내고, 화면은 필요한 순서대로 결과를 기다림
+#  - 페이지 지연 = 왕복 시간의 합 → 가장 느린 쿼리 하나
+#  - 워커에 현재 rerun의 ScriptRunContext/계측 run id를 붙여 st.cache_data·profiled가 그대로 동작
+# ---------------------------
+QUERY_WORKERS = int(os.getenv("QUERY_WORKERS") or 8)
+
+@st.cache_resource(show_spinner=False)
+def get_query_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="query")
+
+def submit(fn, *args):
+    """fn(*args)를 쿼리 풀에서 실행하고 Future 반환 (예외는 .result()에서 다시 발생)."""
+    ctx, run = get_script_run_ctx(), current_run()
+
+    def task():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        use_run(run)
+        return fn(*args)
+
+    return get_query_pool().submit(task)
+
+# 프로세스 첫 실행: 차트/그리드 모듈 import와 첫 DB 연결(TLS 핸드셰이크)을 쿼리 풀에서 먼저 시작
+#  → 스크립트는 DB 왕복을 기다리는 동안 import가 진행되고, 실제로 필요한 곳에서만 기다림 (이후 rerun은 비용 없음)
+#  - import는 CPU 작업이라 DB 지연이 거의 없는 환경(로컬 DB)에서는 오히려 느려질 수 있음 → PRELOAD_MODULES="" 로 끔
+PRELOAD_MODULES = [m for m in os.getenv("PRELOAD_MODULES", "altair,st_aggrid").split(",") if m.strip()]
+
+@st.cache_resource(show_spinner=False)
+def preload_modules() -> list:
+    """쓰는 곳에서는 그냥 import (진행 중이면 import 잠금으로 끝날 때까지 기다림)."""
+    return [get_query_pool().submit(importlib.import_module, m) for m in PRELOAD_MODULES]
 
+@st.cache_resource(show_spinner=False)
+def engine_probe():
+    def probe():
+        with connect(engine) as conn:
+            conn.execute(text("SELECT 1"))
+    return get_query_pool().submit(probe)
+
+def require_db():
+    """백그라운드 연결 확인 결과를 기다림. 실패면 안내 후 중단 (다음 rerun에서 다시 시도)."""
+    try:
+        engine_probe().result()
+    except Exception as e:
+        engine_probe.clear()
+        st.error(f"DB 연결 실패: {e}")
+        st.stop()
+
+# ---------------------------
+# 화면 일부만 다시 실행: 목록/관리 섹션은 st.fragment → 그 안의 조작은 해당 섹션만 rerun (요약/목록 쿼리 없음)
+#  - fragment 단독 실행 시간은 성능 패널에 'fragment:이름'으로 기록
+#  - 쓰기 후에는 rerun_app()으로 결과 메시지를 남기고 전체 rerun (바뀐 데이터로 요약/목록 갱신)
+# ---------------------------
+def fragment(fn):
+    @functools.wraps(fn)
+    def timed(*args, **kwargs):
+        ctx = get_script_run_ctx()
+        alone = bool(ctx and ctx.fragment_ids_this_run)
+        if alone:
+            start_run()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if alone:
+                end_run(f"fragment:{fn.__name__}")
+    return st.fragment(timed)
+
+def rerun_app(section: str, kind: str, msg: str):
+    st.session_state["flash"] = (section, kind, msg)
+    st.rerun(scope="app")
+
+def show_flash(section: str):
+    """rerun_app이 남긴 메시지를 해당 섹션에 한 번 표시."""
+    flash = st.session_state.get("flash")
+    if flash and flash[0] == section:
+        del st.session_state["flash"]
+        getattr(st, flash[1])(flash[2])
+
+# 감사 로그 실행자: 앱 로그인(st.login) 사용자 → 인증 프록시가 넣는 사용자 헤더 순. 둘 다 없으면 화면에서 입력받음
+OPERATOR_HEADERS = [h.strip() for h in (os.getenv("OPERATOR_HEADERS")
+                                        or "X-Forwarded-Email,X-Forwarded-User,X-Auth-Request-Email").split(",")
+                    if h.strip()]
+
+def current_operator() -> str | None:
+    try:
+        if st.user.get("is_logged_in"):
+            return st.user.get("email") or st.user.get("name")
+    except Exception:
+        pass   # 인증 설정이 없는 배포
+    headers = st.context.headers
+    return next((headers[h] for h in OPERATOR_HEADERS if headers.get(h)), None)
+
+PROFILER = os.getenv("PROFILER", "1") != "0"   # 0이면 하단 성능 패널 숨김 (계측은 항상 동작)
+run_id = start_run(started=T_START)
+lap("import")
+preload_modules()
 engine = get_engine()
+engine_probe()
 
 # ---------------------------
-# 쿼리 유틸
-# ---------------------------
-@st.cache_data(ttl=180, show_spinner=False)
-def get_distinct_values():
-    with engine.connect() as conn:
-        platforms = pd.read_sql(text(
-            "SELECT DISTINCT platform FROM incidents WHERE platform<>'' AND platform IS NOT NULL ORDER BY platform"
-        ), conn)["platform"].tolist()
-        locales   = pd.read_sql(text(
-            "SELECT DISTINCT locale FROM incidents WHERE locale<>''   AND locale   IS NOT NULL ORDER BY locale"
-        ), conn)["locale"].tolist()
-        cats      = pd.read_sql(text(
-            "SELECT DISTINCT category FROM incidents WHERE category<>'' AND category IS NOT NULL ORDER BY category"
-        ), conn)["category"].tolist()
-    return platforms, locales, cats
-
-@st.cache_data(ttl=90, show_spinner=False)
-def fetch_kpis(where_sql: str, params: dict):
-    with engine.connect() as conn:
-        # 전체 건수
-        total = pd.read_sql(
-            text(f"SELECT COUNT(*) cnt FROM incidents i WHERE {where_sql}"),
-            conn, params=params
-        )["cnt"].iloc[0]
-
-        # 🔹 최근 한달 건수
-        tparams = dict(params)
-        tparams["date_from"] = datetime.now() - timedelta(days=30)
-        tparams["date_to"]   = datetime.now()
-        month_cnt = pd.read_sql(
-            text(f"SELECT COUNT(*) cnt FROM incidents i WHERE {where_sql}"),
-            conn, params=tparams
-        )["cnt"].iloc[0]
-
-        # 최다 카테고리
-        top_cat_df = pd.read_sql(text(
-            f"SELECT i.category, COUNT(*) cnt FROM incidents i WHERE {where_sql} "
-            "GROUP BY i.category ORDER BY cnt DESC LIMIT 1"
-        ), conn, params=params)
-
-        top_cat = (top_cat_df["category"].iloc[0], int(top_cat_df["cnt"].iloc[0])) if not top_cat_df.empty else ("-", 0)
-
-    return total, month_cnt, top_cat
-
-@st.cache_data(ttl=90, show_spinner=False)
-def fetch_list(where_sql: str, params: dict, limit: int) -> pd.DataFrame:
-    q = text(f"""
-        SELECT i.id, i.started_at, i.ended_at, i.duration, i.platform, i.locale, i.inquiry_count,
-               i.category, i.description, i.cause, i.response, i.note, i.created_at, i.updated_at
-        FROM incidents i
-        WHERE {where_sql}
-        ORDER BY i.started_at DESC
-        LIMIT :limit
-    """)
-    p = dict(params); p["limit"] = int(limit)
-    with engine.connect() as conn:
-        df = pd.read_sql(q, conn, params=p)
-    if not df.empty:
-        df["started_at"] = pd.to_datetime(df["started_at"]).dt.strftime("%Y-%m-%d %H:%M")
-        df["ended_at"]   = df["ended_at"].apply(lambda x: "" if pd.isna(x) else pd.to_datetime(x).strftime("%Y-%m-%d %H:%M"))
-        for col in ["description", "cause", "response", "note"]:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.replace("\r\n", "\n").str.replace("\r", "\n")
-        df["desc_one"] = df["description"].astype(str).str.split("\n").str[0]
-    return df
-
-@st.cache_data(ttl=90, show_spinner=False)
-def fetch_category_counts(where_sql: str, params: dict) -> pd.DataFrame:
-    with engine.connect() as conn:
-        df = pd.read_sql(
-            text(f"SELECT i.category, COUNT(*) cnt FROM incidents i WHERE {where_sql} GROUP BY i.category"),
-            conn, params=params
-        )
-    return df
-
-# 🔹 플랫폼 카운트 (레진/발코니/델리툰 등 원하는 목록만 집계)
-@st.cache_data(ttl=90, show_spinner=False)
-def fetch_platform_counts(where_sql: str, params: dict, platforms: list[str]) -> dict:
-    q = text(f"""
-        SELECT i.platform, COUNT(*) AS cnt
-        FROM incidents i
-        WHERE {where_sql} AND i.platform IN :plist
-        GROUP BY i.platform
-    """)
-    p = dict(params)
-    p["plist"] = tuple(platforms)
-    with engine.connect() as conn:
-        df = pd.read_sql(q, conn, params=p)
-    return dict(zip(df["platform"], df["cnt"]))
-
-PLATFORMS, LOCALES, CATEGORIES = get_distinct_values()
+# rerun 공유 연결: 스크립트 스레드의 조회는 rerun당 연결 1개(= 트랜잭션 1개, 같은 스냅샷)를 재사용
+#  - 쿼리 풀 워커(동시 실행)는 각자 풀에서 연결을 빌림
+#  - 중단된 rerun(st.stop/rerun 예외)이 남긴 연결은 다음 rerun 시작 시 정리
+#  - 쓰기는 기존대로 engine.begin()으로 별도 트랜잭션. 관리 섹션 전에 공유 연결을 닫아
+#    (열린 읽기 트랜잭션의 메타데이터 락이 DDL/쓰기를 막지 않도록) 이후 조회는 각자 연결 사용
+# ---------------------------
+SCRIPT_THREAD = threading.current_thread()
+SHARE_RERUN_CONN = True
+
+@st.cache_resource(show_spinner=False)
+def rerun_conns() -> dict:
+    return {"lock": threading.Lock(), "conns": {}}   # 스크립트 스레드 → Connection
+
+def release_rerun_conn():
+    """현재 스레드와 이미 종료된 스크립트 스레드의 공유 연결을 닫는다."""
+    reg = rerun_conns()
+    with reg["lock"]:
+        done = [t for t in reg["conns"] if t is SCRIPT_THREAD or not t.is_alive()]
+        conns = [reg["conns"].pop(t) for t in done]
+    for conn in conns:
+        conn.close()
+
+@contextmanager
+def db_conn():
+    """스크립트 스레드면 rerun 공유 연결, 아니면(쿼리 풀 워커/관리 섹션) 새로 빌린 연결."""
+    if threading.current_thread() is not SCRIPT_THREAD or not SHARE_RERUN_CONN:
+        with connect(engine) as conn:
+            yield conn
+        return
+    reg = rerun_conns()
+    with reg["lock"]:
+        conn = reg["conns"].get(SCRIPT_THREAD)
+    if conn is None:
+        conn = checkout(engine)
+        with reg["lock"]:
+            reg["conns"][SCRIPT_THREAD] = conn
+    try:
+        yield conn
+    except Exception:
+        conn.rollback()   # 실패한 조회가 공유 트랜잭션을 오염시키지 않도록
+        raise
+
+release_rerun_conn()   # 직전 rerun이 중간에 끝나 남긴 연결 정리
+
+# ---------------------------
+# 조회 캐시: stale-while-revalidate (swr.py)
+#  - ttl이 지나도 직전 결과를 바로 보여주고 갱신은 쿼리 풀에서 백그라운드로 (키당 1건)
+#  - 결과가 없거나 SWR_MAX_STALE초보다 오래됐을 때만 기다림. 같은 키를 동시에 요청한 세션은 한 조회를 공유
+#  - 쓰기 후에는 캐시 버전이 바뀌어 새 키 → 이전 결과를 보여주지 않음
+# ---------------------------
+SWR_MAX_STALE   = float(os.getenv("SWR_MAX_STALE") or 3600)
+SWR_MAX_ENTRIES = int(os.getenv("SWR_MAX_ENTRIES") or 256)
+
+@st.cache_resource(show_spinner=False)
+def swr_cache() -> dict:
+    return open_cache(SWR_MAX_ENTRIES)
+
+def swr_cached(ttl: float):
+    """st.cache_data 대신 쓰는 데코레이터. 키 = (함수 이름, 인자). fn.clear()로 해당 함수 항목 삭제."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return swr_get(swr_cache(), (fn.__name__, freeze(args), freeze(kwargs)),
+                           lambda: fn(*args, **kwargs), ttl, SWR_MAX_STALE, refresh=submit)
+        wrapper.clear = lambda: swr_clear(swr_cache(), fn.__name__)
+        return wrapper
+    return deco
+
+# ---------------------------
+# 캐시 버전 (쓰기 인식 무효화)
+#  - 조회 캐시 키에 조회 기간에 걸친 월(started_at 기준) 버전, 차원 카탈로그 키에 차원 버전을 포함
+#  - 쓰기(삭제/추가/업로드)는 실제로 건드린 월 버전 + 차원 버전만 올림 → 나머지 캐시는 그대로 재사용
+#  - 프로세스 단위 상태이므로 외부에서 직접 수정한 데이터는 기존처럼 TTL 만료로 반영
+# ---------------------------
+@st.cache_resource(show_spinner=False)
+def cache_versions() -> dict:
+    return {"lock": threading.Lock(), "months": {}, "dims": 0}
+
+def month_keys(d_from, d_to) -> list[str]:
+    y, m = d_from.year, d_from.month
+    keys = []
+    while (y, m) <= (d_to.year, d_to.month):
+        keys.append(f"{y:04d}-{m:02d}")
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return keys
+
+def data_version(d_from, d_to) -> tuple:
+    v = cache_versions()
+    with v["lock"]:
+        return tuple(v["months"].get(k, 0) for k in month_keys(d_from, d_to))
+
+def view_versions(params: dict) -> tuple[tuple, tuple]:
+    """(목록/추이 버전: 선택 기간, 요약 버전: 선택 기간 + 최근 30일)"""
+    now = datetime.now()
+    return (data_version(params["date_from"], params["date_to"]),
+            data_version(min(params["date_from"], now - timedelta(days=30)), max(params["date_to"], now)))
+
+def dims_version() -> int:
+    return cache_versions()["dims"]
+
+def invalidate(started_ats):
+    """started_ats가 속한 월의 캐시만 무효화. 값별 건수가 바뀌므로 차원 카탈로그(get_catalog)는 항상 갱신.
+    스냅샷 모드면 스냅샷도 동기화 대상으로 표시."""
+    months = {f"{t.year:04d}-{t.month:02d}" for t in pd.to_datetime(pd.Series(list(started_ats))).dropna()}
+    v = cache_versions()
+    with v["lock"]:
+        for k in months:
+            v["months"][k] = v["months"].get(k, 0) + 1
+        v["dims"] += 1
+    snap = get_snapshot()
+    if snap is not None:
+        snap["dirty"] = True   # 다음 rerun에서 스냅샷 동기화
+    submit(warm_default_view)  # 바뀐 버전으로 기본 화면 다시 채움 (기다리지 않음)
+
+# ---------------------------
+# 일별 집계 테이블 (incidents_daily)
+#  - (day, platform, locale, category) 단위 건수/문의량 합계
+#  - 삭제/추가/업로드 시 같은 트랜잭션에서 영향받은 날짜만 다시 집계
+#  - 키워드 필터가 없으면 요약 쿼리는 이 테이블을 읽음 (비용 ∝ 기간 일수)
+# ---------------------------
+@st.cache_resource(show_spinner="일별 집계 준비 중...")
+def ensure_daily_rollup() -> tuple[bool, str | None]:
+    """집계/카탈로그 테이블을 만들고 완성 표시가 없으면 전체 재구축 (여러 프로세스가 떠도 GET_LOCK으로 1곳만).
+    반환: (사용 가능 여부, 실패 사유). 권한/잠금 대기 초과 등으로 실패하면 원본 테이블로 집계."""
+    try:
+        with engine.begin() as conn:
+            insp = inspect(conn)
+            for name, ddl in [("incidents_daily", ROLLUP_DDL), ("incidents_dims", DIMS_DDL)]:
+                if not insp.has_table(name):
+                    conn.execute(text(ddl))
+            done = rollup_complete(conn)
+            if done and conn.execute(text("SELECT 1 FROM incidents_dims LIMIT 1")).first() is None:
+                rebuild_dims(conn)   # 카탈로그 도입 전에 만들어진 집계 테이블
+        if not done:
+            ensure_rollup(engine)    # 중간에 멈춘 집계(완성 표시 없음)도 처음부터 다시
+        return True, None
+    except Exception as e:
+        log.exception("일별 집계 준비 실패 → 원본 테이블로 집계")
+        return False, str(e)
+
+# ---------------------------
+# 차원 카탈로그: 플랫폼/로케일/카테고리 값 + 값별 건수 (사이드바 선택지, 입력 폼 드롭다운)
+#  - 집계 테이블이 있으면 incidents_dims(일별 집계와 함께 증감 유지)만 읽음 → 원본 테이블 크기와 무관
+#  - 쓰기 시 invalidate()가 차원 버전을 올려 다시 계산, 외부 변경은 TTL로 반영
+# ---------------------------
+@profiled
+@swr_cached(ttl=180)
+def get_catalog(dims_ver: int = 0, use_rollup: bool = False, live: bool = False) -> dict:
+    with db_conn() as conn:
+        return run_catalog(conn, use_rollup, live)
+
+def with_count(dim: str):
+    """multiselect format_func: '값 (건수)'"""
+    counts = CATALOG[dim]
+    return lambda v: f"{v} ({counts.get(v, 0):,})"
+
+KPI_PLATFORMS = ["레진", "발코니", "델리툰"]
+
+# 🔹 요약 엔진: (category, platform) 단위 1회 집계로 KPI/차트/플랫폼 카운트를 모두 계산
+#    cnt = 선택 기간 건수, month_cnt = 최근 30일 건수 (두 기간을 한 번의 스캔으로 집계)
+#    use_rollup=True면 incidents_daily에서 집계 (키워드 조건이 없을 때만 가능, 최근 30일은 일 단위)
+@profiled
+@swr_cached(ttl=90)
+def fetch_summary(filter_sql: str, params: dict, ver: tuple = (), use_rollup: bool = False,
+                  live: bool = False) -> pd.DataFrame:
+    with db_conn() as conn:
+        return run_summary(conn, filter_sql, params, use_rollup, live=live)
+
+def derive_summary(sdf: pd.DataFrame, platforms: list[str]) -> dict:
+    """fetch_summary 결과 하나로 KPI 카드/카테고리 차트/플랫폼 KPI 값을 만든다."""
+    in_range = sdf[sdf["cnt"] > 0]
+    cat_df = (in_range.groupby("category", dropna=False, as_index=False)["cnt"].sum()
+              .sort_values("cnt", ascending=False, kind="stable").reset_index(drop=True))
+    pf = in_range.groupby("platform")["cnt"].sum()
+    top_cat = (str(cat_df["category"].iloc[0]), int(cat_df["cnt"].iloc[0])) if not cat_df.empty else ("-", 0)
+    return {
+        "total":     int(sdf["cnt"].sum()),
+        "month_cnt": int(sdf["month_cnt"].sum()),
+        "top_cat":   top_cat,
+        "cat_df":    cat_df,
+        "pf_counts": {p: int(pf.get(p, 0)) for p in platforms},
+    }
+
+# 🔹 추이: 기간에 맞춘 버킷(시간/일/주/월/년, 최대 MAX_TREND_BUCKETS개)으로 SQL에서 집계
+#    일 이상 버킷 + 키워드 없음이면 incidents_daily에서 집계. 상위 계열 외에는 '기타'로 합침
+@profiled
+@swr_cached(ttl=90)
+def fetch_trend(filter_sql: str, params: dict, bucket: str, by: str, ver: tuple = (),
+                use_rollup: bool = False, live: bool = False) -> pd.DataFrame:
+    with db_conn() as conn:
+        return run_trend(conn, filter_sql, params, bucket, by, use_rollup, live)
+
+# 🔹 장애시간: (platform, category) 단위 1회 집계 → MTTR/총 장애시간/영향도(문의×분) KPI와 표를 모두 계산
+@profiled
+@swr_cached(ttl=90)
+def fetch_impact(where_sql: str, params: dict, ver: tuple = ()) -> pd.DataFrame:
+    with db_conn() as conn:
+        return run_impact(conn, where_sql, params)
+
+def format_minutes(m) -> str:
+    """분 → '1d 2h' / '2h 30m' / '45m' (없으면 '-')."""
+    if m is None or pd.isna(m):
+        return "-"
+    m = int(round(m))
+    d, h, mm = m // 1440, m % 1440 // 60, m % 60
+    return f"{d}d {h}h" if d else f"{h}h {mm}m" if h else f"{mm}m"
+
+TREND_BY = {"카테고리": "category", "플랫폼": "platform"}
+TREND_LABEL = {"hour": "시간", "day": "일", "week": "주", "month": "월", "year": "년"}
+TREND_TICK = {"hour": "%m-%d %H시", "day": "%Y-%m-%d", "week": "%Y-%m-%d주", "month": "%Y-%m", "year": "%Y"}
+
+DETAIL_CACHE_SIZE = 64
+PAGE_SIZES = [15, 30, 50, 100]
+
+# 🔹 상세: 펼친 행의 원문만 id로 조회 (최근 펼친 DETAIL_CACHE_SIZE건 LRU 캐시)
+#  - ver = dims_version(): 어떤 쓰기(추가/업로드/삭제/복구)든 올라가므로 쓰기 후에는 다시 조회
+@profiled
+@st.cache_data(ttl=300, max_entries=DETAIL_CACHE_SIZE, show_spinner=False)
+def fetch_detail(incident_id: int, live: bool = False, ver: int = 0) -> dict:
+    with db_conn() as conn:
+        return run_detail(conn, incident_id, live)
+
+@profiled
+@swr_cached(ttl=90)
+def fetch_list(where_sql: str, params: dict, limit: int, ver: tuple = ()) -> pd.DataFrame:
+    with db_conn() as conn:
+        return run_list(conn, where_sql, params, limit)
+
+# 🔹 키셋 페이지: (started_at, id) 내림차순에서 cursor 다음 page_size행만 조회 (OFFSET 없음)
+@profiled
+@swr_cached(ttl=90)
+def fetch_page(where_sql: str, params: dict, cursor: tuple | None, page_size: int, ver: tuple = ()):
+    with db_conn() as conn:
+        return run_page(conn, where_sql, params, cursor, page_size)
+
+# ---------------------------
+# 로컬 스냅샷 모드 (SNAPSHOT=1, pyarrow 필요)
+#  - 요약/목록을 프로세스 공유 Arrow 스냅샷(memory-map)에서 계산 → 필터 조작이 DB에 쿼리를 보내지 않음
+#  - 동기화(updated_at 증분)는 SNAPSHOT_TTL초마다 또는 이 프로세스의 쓰기 직후 쿼리 풀에서 백그라운드로.
+#    화면은 그동안 직전 스냅샷을 사용하고, 최초 적재만 기다림
+#  - 상세 원문/관리 기능은 기존처럼 DB
+# ---------------------------
+SNAPSHOT_MODE = os.getenv("SNAPSHOT", "0") == "1"
+SNAPSHOT_TTL  = float(os.getenv("SNAPSHOT_TTL") or 60)
+
+@st.cache_resource(show_spinner=False)
+def get_snapshot():
+    if not SNAPSHOT_MODE or not snapshot_available():
+        return None
+    return open_snapshot(os.getenv("SNAPSHOT_PATH") or SNAPSHOT_PATH)
+
+# ---------------------------
+# 키워드 검색: FULLTEXT(ngram) 인덱스 우선, 없으면 LIKE 스캔
+# ---------------------------
+@swr_cached(ttl=600)
+def get_fulltext_token_size() -> int:
+    """incidents에 FULLTEXT 인덱스가 있으면 ngram 토큰 크기, 없으면 0."""
+    with db_conn() as conn:
+        return fulltext_token_size(conn)
+
+def create_fulltext_index():
+    """마이그레이션: 한국어 검색용 ngram FULLTEXT 인덱스 생성 (테이블 크기에 따라 수 분 소요)."""
+    with engine.begin() as conn:
+        conn.execute(text(fulltext_ddl()))
+    get_fulltext_token_size.clear()
+
+@st.cache_data(ttl=600, show_spinner=False)
+def dedup_ready() -> bool:
+    """content_key UNIQUE 인덱스가 있으면 업로드/입력 시 중복제거."""
+    with db_conn() as conn:
+        return has_content_key(conn)
+
+@swr_cached(ttl=600)
+def duration_ready() -> bool:
+    """duration_minutes 컬럼이 있으면 입력/업로드 시 함께 저장하고 장애시간 KPI 표시."""
+    with db_conn() as conn:
+        return has_duration_minutes(conn)
+
+@swr_cached(ttl=600)
+def soft_delete_ready() -> bool:
+    """deleted_at 컬럼이 있으면 원본 테이블 조회에서 삭제 표시된 행 제외 + 삭제 표시(soft delete) 사용 가능."""
+    with db_conn() as conn:
+        return has_soft_delete(conn)
+
+# 🔹 스키마 점검: 누락 인덱스 + 대표 쿼리 EXPLAIN 전체 스캔 여부 (1시간 캐시)
+@swr_cached(ttl=3600)
+def schema_report() -> dict:
+    try:
+        with db_conn() as conn:
+            return {"missing": missing_indexes(conn), "warnings": plan_warnings(conn), "error": None}
+    except Exception as e:
+        return {"missing": [], "warnings": [], "error": str(e)}
+
+@st.cache_resource(show_spinner=False)
+def prefetch_checks() -> list:
+    """프로세스 첫 실행: 서로 독립인 점검 조회를 동시에 보내 둠 → 아래의 같은 호출은 진행 중인 조회에 합류."""
+    return [submit(check) for check in (soft_delete_ready, duration_ready, get_fulltext_token_size, schema_report)]
+
+require_db()
+prefetch_checks()
+ROLLUP_READY, ROLLUP_ERROR = ensure_daily_rollup()
+
+SNAP = get_snapshot()
+if SNAP is not None:
+    if SNAP["table"] is None:
+        try:
+            with st.spinner("로컬 스냅샷 최초 적재 중..."):
+                sync_if_stale(SNAP, engine, SNAPSHOT_TTL)
+        except Exception as e:
+            st.warning(f"스냅샷 적재 실패 — DB에서 조회합니다: {e}")
+    elif is_stale(SNAP, SNAPSHOT_TTL):
+        submit(sync_if_stale, SNAP, engine, SNAPSHOT_TTL)   # 기다리지 않음
+USE_SNAPSHOT = SNAP is not None and SNAP["table"] is not None
+
+# ---------------------------
+# 기본 화면 예열: 최근 30일 · 필터 없음 · 첫 페이지 · 카테고리 추이 (모두가 처음 여는 화면)
+#  - 프로세스 시작 시 띄운 스레드가 SWR_WARM초마다 조회 → 첫 화면은 캐시에서 바로 (만료분은 SWR 갱신)
+#    날짜가 바뀌어 키가 달라져도 다음 주기에 채워짐. 쓰기(invalidate) 직후에도 한 번 예열
+#  - 스냅샷 모드면 요약/목록은 스냅샷에서 계산하므로 카탈로그만
+# ---------------------------
+SWR_WARM = float(os.getenv("SWR_WARM") or 60)   # 0이면 예열 끔
+
+def warm_default_view():
+    today = datetime.now().date()
+    p, filters = build_filters(datetime.combine(today - timedelta(days=30), datetime.min.time()),
+                               datetime.combine(today, datetime.max.time()))
+    live = soft_delete_ready()
+    f_sql, w_sql = where_sqls(filters, live)
+    l_ver, s_ver = view_versions(p)
+    get_catalog(dims_version(), ROLLUP_READY, live)
+    if get_snapshot() is not None:
+        return
+    fetch_summary(f_sql, p, s_ver, ROLLUP_READY, live)
+    fetch_trend(f_sql, p, trend_bucket(p["date_from"], p["date_to"]), TREND_BY[list(TREND_BY)[0]], l_ver,
+                ROLLUP_READY, live)
+    fetch_page(w_sql, p, None, PAGE_SIZES[0], l_ver)
+    if duration_ready():
+        fetch_impact(w_sql, p, l_ver)
+
+@st.cache_resource(show_spinner=False)
+def start_warmer():
+    if SWR_WARM <= 0:
+        return None
+    ctx = get_script_run_ctx()
+
+    def loop():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        while True:
+            try:
+                warm_default_view()
+            except Exception:
+                pass   # DB 장애 중에도 화면은 직전 결과로 동작. 다음 주기에 재시도
+            time.sleep(SWR_WARM)
+
+    t = threading.Thread(target=loop, name="swr-warm", daemon=True)
+    t.start()
+    return t
+
+start_warmer()
+
+SOFT_DELETE_READY = soft_delete_ready()
+CATALOG = get_catalog(dims_version(), ROLLUP_READY, SOFT_DELETE_READY)
+PLATFORMS, LOCALES, CATEGORIES = (list(CATALOG[d]) for d in ["platform", "locale", "category"])
+lap("시작(엔진/선택지)")
+
+schema_state = schema_report()
+if schema_state["missing"] or schema_state["warnings"]:
+    st.warning("인덱스 점검: 일부 대시보드 쿼리가 전체 스캔으로 동작합니다. 하단 [🗄 스키마]에서 마이그레이션을 실행하세요.\n\n"
+               + "\n".join(f"- 누락/변경 인덱스 `{n}`" for n in schema_state["missing"])
+               + ("\n" if schema_state["missing"] else "")
+               + "\n".join(f"- {w}" for w in schema_state["warnings"]))
 
 # ---------------------------
 # 사이드바 필터 (시작/종료일 개별 입력)
@@ -180,59 +581,118 @@ with st.sidebar:
         end_date = start_date
         st.session_state["end_date"] = end_date
 
-    sel_platforms  = st.multiselect("플랫폼", options=PLATFORMS)
-    sel_locales    = st.multiselect("로케일", options=LOCALES)
-    sel_categories = st.multiselect("카테고리", options=CATEGORIES)
+    sel_platforms  = st.multiselect("플랫폼", options=PLATFORMS, format_func=with_count("platform"))
+    sel_locales    = st.multiselect("로케일", options=LOCALES, format_func=with_count("locale"))
+    sel_categories = st.multiselect("카테고리", options=CATEGORIES, format_func=with_count("category"))
     keyword        = st.text_input("키워드(내용/원인/대응/비고)")
-    limit          = st.number_input("목록 행수", min_value=50, max_value=5000, value=500, step=50)
+    trend_by       = st.radio("추이 기준", list(TREND_BY), horizontal=True)
+    list_mode      = st.radio("목록 방식", ["페이지", "전체"], horizontal=True,
+                              help="페이지: 필요한 페이지만 조회 / 전체: 목록 행수만큼 한 번에 조회")
+    if list_mode == "페이지":
+        page_size  = st.selectbox("페이지당 행수", PAGE_SIZES, index=0)
+    else:
+        limit      = st.number_input("목록 행수", min_value=50, max_value=5000, value=500, step=50)
 
-params = {
-    "date_from": datetime.combine(start_date, datetime.min.time()),
-    "date_to":   datetime.combine(end_date,   datetime.max.time()),
-}
-where = ["i.started_at BETWEEN :date_from AND :date_to"]
-if sel_platforms:
-    where.append("i.platform IN :platforms");   params["platforms"]  = tuple(sel_platforms)
-if sel_locales:
-    where.append("i.locale IN :locales");       params["locales"]    = tuple(sel_locales)
-if sel_categories:
-    where.append("i.category IN :categories");  params["categories"] = tuple(sel_categories)
-if keyword.strip():
-    where.append("(i.description LIKE :kw OR i.cause LIKE :kw OR i.response LIKE :kw OR i.note LIKE :kw)")
-    params["kw"] = f"%{keyword.strip()}%"
-where_sql = " AND ".join(where)
+kw_sql, kw_params = keyword_clause(keyword, get_fulltext_token_size())
+params, filters = build_filters(
+    datetime.combine(start_date, datetime.min.time()),
+    datetime.combine(end_date,   datetime.max.time()),
+    sel_platforms, sel_locales, sel_categories, (kw_sql, kw_params),
+)
+filter_sql, where_sql = where_sqls(filters, SOFT_DELETE_READY)
+
+list_ver, summary_ver = view_versions(params)
+
+def load_list(cursor=None):
+    """현재 필터의 목록: 페이지 방식이면 (DataFrame, 다음 cursor), 전체 방식이면 DataFrame."""
+    if list_mode == "페이지":
+        return (snap_page(SNAP, params, keyword, cursor, int(page_size)) if USE_SNAPSHOT
+                else fetch_page(where_sql, params, cursor, int(page_size), list_ver))
+    return (snap_list(SNAP, params, keyword, int(limit)) if USE_SNAPSHOT
+            else fetch_list(where_sql, params, int(limit), list_ver))
+
+lap("사이드바/스키마 점검")
 
 # ===========================
 # 요약: (좌) 카테고리 그래프 / (우) KPI
 # ===========================
 st.subheader("요약")
 
-# KPI 먼저 계산
-total, month_cnt, (top_cat_name, top_cat_cnt) = fetch_kpis(where_sql, params)
+# 요약/추이/목록 쿼리를 동시에 보냄 → KPI는 요약 결과가 오는 대로 그리고, 목록은 아래에서 기다림
+if list_mode == "페이지":
+    # 필터가 바뀌면 첫 페이지로. page_cursors[k] = k번째 페이지의 시작 cursor
+    filter_sig = repr((where_sql, sorted(params.items()), page_size))
+    if st.session_state.get("page_sig") != filter_sig:
+        st.session_state["page_sig"] = filter_sig
+        st.session_state["page_cursors"] = [None]
+    list_cursor = st.session_state["page_cursors"][-1]
+else:
+    list_cursor = None
+list_future = submit(load_list, list_cursor)
+summary_future = (submit(snap_summary, SNAP, params, keyword) if USE_SNAPSHOT
+                  else submit(fetch_summary, filter_sql, params, summary_ver, ROLLUP_READY and not kw_sql,
+                              SOFT_DELETE_READY))
+bucket = trend_bucket(params["date_from"], params["date_to"])
+trend_future = (submit(snap_trend, SNAP, params, keyword, bucket, TREND_BY[trend_by]) if USE_SNAPSHOT
+                else submit(fetch_trend, filter_sql, params, bucket, TREND_BY[trend_by], list_ver,
+                            ROLLUP_READY and not kw_sql, SOFT_DELETE_READY))
+DURATION_READY = duration_ready()
+impact_future = submit(fetch_impact, where_sql, params, list_ver) if DURATION_READY else None   # 스냅샷 모드도 DB 집계
+if USE_SNAPSHOT and SNAP["stats"]:
+    st.caption(f"로컬 스냅샷 기준 · {SNAP['stats']['rows']:,}행 · 동기화 {SNAP['stats']['synced_at']:%Y-%m-%d %H:%M:%S}")
+
+# KPI/차트/플랫폼 KPI(레진/발코니/델리툰) — 요약 쿼리 1회로 계산
 try:
-    _t, _td, (cat_name, cat_cnt) = fetch_kpis(where_sql, params)
-    total, today_cnt, top_cat_name, top_cat_cnt = int(_t), int(_td), str(cat_name), int(cat_cnt)
+    summary = derive_summary(summary_future.result(), KPI_PLATFORMS)
 except Exception as e:
     st.warning(f"KPI 로딩 오류: {e}")
+    summary = derive_summary(pd.DataFrame(columns=["category", "platform", "cnt", "month_cnt"]), KPI_PLATFORMS)
+
+# MTTR/총 장애시간/영향도 — 장애시간 집계 1회로 KPI 카드와 플랫폼/카테고리 표를 계산
+impact_df = None
+if impact_future is not None:
+    try:
+        impact_df = impact_future.result()
+    except Exception as e:
+        st.warning(f"장애시간 로딩 오류: {e}")
+impact_cards = ""
+if impact_df is not None:
+    imp = impact_totals(impact_df)
+    coverage = f"{imp['coverage']:.0%} 기록" if imp["coverage"] is not None else "-"
+    impact_cards = f"""
+          <div class="kpi-card">
+            <div class="kpi-title">MTTR</div>
+            <div class="kpi-value">{format_minutes(imp['mttr'])}</div>
+            <div class="kpi-sub">평균 장애시간 · {coverage}</div>
+          </div>
+          <div class="kpi-card">
+            <div class="kpi-title">총 장애시간</div>
+            <div class="kpi-value">{format_minutes(imp['downtime'])}</div>
+            <div class="kpi-sub">{imp['downtime']:,}분</div>
+          </div>
+          <div class="kpi-card">
+            <div class="kpi-title">영향도</div>
+            <div class="kpi-value">{imp['impact']:,}</div>
+            <div class="kpi-sub">문의량 × 장애시간(분)</div>
+          </div>"""
+
+total, month_cnt = summary["total"], summary["month_cnt"]
+top_cat_name, top_cat_cnt = summary["top_cat"]
+resin_cnt    = summary["pf_counts"]["레진"]
+balcony_cnt  = summary["pf_counts"]["발코니"]
+delitoon_cnt = summary["pf_counts"]["델리툰"]
 
-# 🔹 플랫폼 KPI(레진/발코니/델리툰) — DB에서 직접 집계
-pf_counts = fetch_platform_counts(where_sql, params, ["레진", "발코니", "델리툰"])
-resin_cnt    = int(pf_counts.get("레진", 0))
-balcony_cnt  = int(pf_counts.get("발코니", 0))
-delitoon_cnt = int(pf_counts.get("델리툰", 0))
+import altair as alt   # preload_modules가 미리 import (첫 실행은 요약 쿼리와 겹쳐 진행)
 
 # 좌/우 50% 배치
 col_chart, col_kpi = st.columns([1, 1])
 
 with col_chart:
-    cat_df = fetch_category_counts(where_sql, params)
-    if cat_df.empty:
+    plot_df = summary["cat_df"]   # 건수 내림차순 정렬됨
+    if plot_df.empty:
         st.info("카테고리 데이터가 없습니다.")
     else:
-        # 🔹 총건수 제외
-        cat_sorted = cat_df.sort_values("cnt", ascending=False).reset_index(drop=True)
-        plot_df    = cat_sorted.copy()
-        order      = plot_df["category"].tolist()
+        order = plot_df["category"].tolist()
 
         base = alt.Chart(plot_df).encode(
             y=alt.Y("category:N", sort=order, title=""),
@@ -310,33 +770,100 @@ with col_kpi:
             <div class="kpi-title">델리툰</div>
             <div class="kpi-value">{delitoon_cnt:,}</div>
           </div>
+          {impact_cards}
         </div>
         """,
         unsafe_allow_html=True
     )
 
+if impact_df is not None and not impact_df.empty:
+    with st.expander("⏱ 장애시간 분석 (플랫폼/카테고리별 MTTR · 총 장애시간 · 영향도)"):
+        labels = {"cnt": "건수", "timed": "시간 기록", "mttr": "MTTR(분)", "downtime": "총 장애시간(분)",
+                  "impact": "영향도(문의×분)"}
+        for c, (by, title) in zip(st.columns(2), [("platform", "플랫폼"), ("category", "카테고리")]):
+            with c:
+                t = impact_by(impact_df, by)[[by, "cnt", "timed", "mttr", "downtime", "impact"]]
+                st.dataframe(t.rename(columns={by: title, **labels}), hide_index=True, use_container_width=True)
+elif not DURATION_READY:
+    st.caption("장애시간(분) 컬럼이 없어 MTTR/장애시간 KPI를 숨깁니다. 하단 [🕒 장애시간]에서 생성/백필할 수 있습니다.")
+
+lap("요약")
+
 # ---------------------------------------------------------------------
-# 장애 리스트 (마스터/디테일: 행 클릭으로 상세 펼치기) + 폰트 축소
+# 추이: 버킷별 건수 (카테고리/플랫폼 누적 막대). 포인트 ≤ 버킷 수 × 계열 수 → 원본 행은 브라우저로 보내지 않음
 # ---------------------------------------------------------------------
-st.subheader("📄 장애 리스트")
+st.subheader(f"📈 추이 ({TREND_LABEL[bucket]} 단위)")
+try:
+    trend_df = trend_future.result()
+except Exception as e:
+    st.warning(f"추이 로딩 오류: {e}")
+    trend_df = pd.DataFrame(columns=["bucket", "series", "cnt"])
 
-list_df = fetch_list(where_sql, params, int(limit))
-if list_df.empty:
-    st.info("조건에 맞는 데이터가 없습니다.")
+if trend_df.empty:
+    st.info("추이 데이터가 없습니다.")
 else:
-    md_df = list_df.copy()
-    md_df["desc_one"] = md_df["description"].astype(str).str.split("\n").str[0]
+    # 건수 없는 구간도 0으로 남겨 축이 실제 시간 간격을 유지
+    trend_df = fill_buckets(trend_df, bucket, params["date_from"], params["date_to"])
+    trend_df = trend_df.assign(label=trend_df["bucket"].dt.strftime(TREND_TICK[bucket]))
+    st.altair_chart(
+        alt.Chart(trend_df).mark_bar().encode(
+            x=alt.X("label:N", sort=trend_df["label"].drop_duplicates().tolist(), title="",
+                    axis=alt.Axis(labelAngle=-45)),
+            y=alt.Y("sum(cnt):Q", title="건수", axis=alt.Axis(format="d", tickMinStep=1)),
+            color=alt.Color("series:N", title=trend_by),
+            tooltip=[alt.Tooltip("label:N", title="구간"), alt.Tooltip("series:N", title=trend_by),
+                     alt.Tooltip("cnt:Q", title="건수", format=",")],
+        ).properties(height=260),
+        use_container_width=True,
+    )
+
+lap("추이")
+
+# ---------------------------------------------------------------------
+# 장애 리스트 (마스터/디테일: 행 클릭 시 상세 원문 조회) + 폰트 축소
+# ---------------------------------------------------------------------
+@fragment
+def list_section(prefetched: tuple, total: int):
+    """행 선택(상세)/페이지 이동은 이 fragment만 다시 실행 → 요약/추이 쿼리·차트는 그대로."""
+    from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode   # preload_modules가 미리 import
+
+    cursor, fut = prefetched
+    if list_mode == "페이지":
+        cursors = st.session_state["page_cursors"]
+        list_df, next_cursor = fut.result() if cursors[-1] == cursor else load_list(cursors[-1])
+        n_pages = max(1, -(-total // int(page_size)))
+
+        def _next_page():
+            st.session_state["page_cursors"].append(next_cursor)
 
-    gb = GridOptionsBuilder.from_dataframe(md_df)
+        def _prev_page():
+            st.session_state["page_cursors"].pop()
+
+        c_prev, c_pos, c_next = st.columns([1, 2, 1])
+        with c_prev:
+            st.button("◀ 이전", on_click=_prev_page, disabled=len(cursors) <= 1, use_container_width=True)
+        with c_pos:
+            st.markdown(f"<div style='text-align:center'>{len(cursors)} / {n_pages} 페이지 · 총 {total:,}건</div>",
+                        unsafe_allow_html=True)
+        with c_next:
+            st.button("다음 ▶", on_click=_next_page, disabled=next_cursor is None, use_container_width=True)
+        grid_height = min(560, 34 * (len(list_df) + 1) + 16)
+    else:
+        list_df = fut.result()
+        grid_height = 560
+
+    lap("목록 쿼리")
+
+    if list_df.empty:
+        st.info("조건에 맞는 데이터가 없습니다.")
+        return
+    gb = GridOptionsBuilder.from_dataframe(list_df)
     gb.configure_grid_options(
-        masterDetail=True,
-        detailRowAutoHeight=True,
-        detailRowHeight=220,
         rowHeight=34,
-        onRowClicked=JsCode("function(e){ e.node.setExpanded(!e.node.expanded); }"),
         suppressRowClickSelection=False,
         suppressCellSelection=True,
     )
+    gb.configure_selection("single")
 
     # 마스터(요약) 보이는 컬럼
     gb.configure_column("desc_one", header_name="description",
@@ -349,118 +876,264 @@ else:
     gb.configure_column("locale",     width=70)
     gb.configure_column("inquiry_count", header_name="문의량", width=80)
 
-    # 디테일로 넘길 원문·관리 컬럼은 마스터에서 숨김
-    for col in ["description", "cause", "response", "note", "created_at", "updated_at"]:
-        if col in md_df.columns:
-            gb.configure_column(col, hide=True)
-
-    # 디테일 그리드
-    detail_col_defs = [
-        {"field": "description", "headerName": "장애내용",
-         "wrapText": True, "autoHeight": True,
-         "cellStyle": {"white-space": "pre-wrap", "line-height": "1.3"}},
-        {"field": "cause", "headerName": "원인",
-         "wrapText": True, "autoHeight": True,
-         "cellStyle": {"white-space": "pre-wrap", "line-height": "1.3"}},
-        {"field": "response", "headerName": "대응",
-         "wrapText": True, "autoHeight": True,
-         "cellStyle": {"white-space": "pre-wrap", "line-height": "1.3"}},
-        {"field": "note", "headerName": "비고",
-         "wrapText": True, "autoHeight": True,
-         "cellStyle": {"white-space": "pre-wrap", "line-height": "1.3"}},
-    ]
-    detail_grid_options = {
-        "defaultColDef": {"flex": 1, "sortable": False, "filter": False, "resizable": True},
-        "columnDefs": detail_col_defs,
-        "suppressCellSelection": True,
-        "rowHeight": 24,
-    }
-
-    gb.configure_grid_options(
-        detailCellRendererParams={
-            "detailGridOptions": detail_grid_options,
-            "getDetailRowData": JsCode("function(params){ params.successCallback([params.data]); }"),
-        }
-    )
-
     grid = AgGrid(
-        md_df[[
+        list_df[[
             "id", "started_at", "ended_at", "duration",
             "platform", "locale", "inquiry_count", "category", "desc_one",
-            # detail 전달용 숨김 컬럼
-            "description", "cause", "response", "note", "created_at", "updated_at"
         ]],
         gridOptions=gb.build(),
         theme="streamlit",
-        height=560,
-        allow_unsafe_jscode=True,
-        update_mode=GridUpdateMode.NO_UPDATE,
+        height=grid_height,
+        update_mode=GridUpdateMode.SELECTION_CHANGED,
         enable_enterprise_modules=True,
     )
 
+    # 디테일: 선택(클릭)한 행의 원문을 id로 조회해 펼침
+    selected = grid["selected_rows"]
+    if isinstance(selected, pd.DataFrame):
+        selected = selected.to_dict("records")
+    if selected:
+        detail = fetch_detail(int(selected[0]["id"]), SOFT_DELETE_READY, dims_version())
+        if not detail:
+            st.info("삭제되었거나 찾을 수 없는 항목입니다.")
+        else:
+            st.markdown(
+                """
+                <style>
+                  .detail-title{ font-size:13px; font-weight:700; margin:0 0 4px 0; opacity:0.85; }
+                  .detail-body{ font-size:12px; white-space:pre-wrap; line-height:1.3; }
+                </style>
+                """,
+                unsafe_allow_html=True
+            )
+            st.caption(f"#{detail['id']} · created_at {detail['created_at']} · updated_at {detail['updated_at']}")
+            for c, (col, title) in zip(st.columns(4), [("description", "장애내용"), ("cause", "원인"),
+                                                       ("response", "대응"), ("note", "비고")]):
+                with c:
+                    st.markdown(f"<div class='detail-title'>{title}</div>"
+                                f"<div class='detail-body'>{html.escape(detail[col])}</div>",
+                                unsafe_allow_html=True)
+    lap("목록 렌더(AgGrid/상세)")
+
+st.subheader("📄 장애 리스트")
+list_section((list_cursor, list_future), total)
+
+
+SHARE_RERUN_CONN = False   # 이하 관리 섹션: 쓰기/DDL 전에 공유 읽기 트랜잭션 종료
+release_rerun_conn()
+
+# ---------------------------
+# 관리 섹션: 각각 fragment + 펼쳤을 때만 본문 실행(expander on_change="rerun" → .open)
+#  - 닫혀 있으면 위젯/건수 조회/전용 모듈 import 모두 건너뜀 → 사이드바 조작 시 비용 없음
+# ---------------------------
+
+# ---------------------------
+# 내보내기 (현재 필터 전체 → CSV/엑셀)
+#  - 서버 측 커서로 청크씩 받아 임시 파일에 바로 씀 (결과 전체를 DataFrame으로 올리지 않음)
+#  - 다운로드 버튼은 완성된 임시 파일을 읽어 전달. 필터가 바뀌거나 다시 만들면 이전 파일 삭제
+# ---------------------------
+@fragment
+def export_section(where_sql: str, params: dict, total: int, start_date, end_date):
+    with st.expander("📤 내보내기", key="sec_export", on_change="rerun") as sec:
+        if not sec.open:
+            return
+        from exporter import EXPORT_FORMATS, ExportFile, export
+
+        st.caption(f"현재 필터 조건의 전체 {total:,}건 (목록 행수 제한 없음)")
+        ex_fmt = st.radio("형식", EXPORT_FORMATS, horizontal=True, format_func=str.upper, key="export_fmt")
+        ex_sig = repr((where_sql, sorted(params.items()), ex_fmt))
+        # 세션당 파일 1개: 조건이 바뀌거나 새로 만들면 이전 파일 삭제, 세션이 끝나면 ExportFile 정리 시 삭제
+        prev = st.session_state.get("export_file")
+        if prev and prev.sig != ex_sig:
+            prev.remove()
+            st.session_state.pop("export_file")
+            prev = None
+        if st.button("파일 만들기"):
+            if prev:
+                prev.remove()
+                st.session_state.pop("export_file")
+            bar = st.progress(0.0, text="내보내는 중...")
+            out = ExportFile(ex_fmt, ex_sig)
+            try:
+                with open(out.path, "wb") as f, connect(engine) as conn:
+                    out.rows = export(conn, where_sql, params, ex_fmt, f,
+                                      progress=lambda n: bar.progress(min(n / total, 1.0) if total else 1.0,
+                                                                      text=f"{n:,}행"))
+                bar.progress(1.0, text=f"{out.rows:,}행 완료")
+                st.session_state["export_file"] = prev = out
+            except Exception as e:
+                out.remove()
+                prev = None
+                st.error(f"내보내기 중 오류: {e}")
+        if prev and prev.exists():
+            with open(prev.path, "rb") as f:
+                st.download_button(
+                    f"⬇ 다운로드 ({prev.rows:,}건)", f,
+                    file_name=f"incidents_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{ex_fmt}",
+                    mime="text/csv" if ex_fmt == "csv" else
+                         "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                )
+
+export_section(where_sql, params, total, start_date, end_date)
+
 # ---------------------------
-# 선택삭제
+# 일괄삭제
+#  - 대상: ID/ID 범위 또는 현재 사이드바 필터 결과
+#  - DELETE_BATCH행씩 짧은 트랜잭션으로 나눠 삭제 → 긴 잠금 없이 다른 사용자의 조회와 번갈아 진행
+#  - deleted_at 컬럼이 있으면 삭제 표시(soft delete)를 기본으로, 작업 id로 되돌릴 수 있음
+#  - 모든 작업은 incidents_audit에 기록
 # ---------------------------
-with st.expander("🗑 선택삭제"):
-    ids = st.text_input("삭제할 ID들(쉼표로 구분)", placeholder="예: 101,102,120")
-    if st.button("삭제 실행", type="primary"):
+@fragment
+def delete_section(where_sql: str, params: dict, start_date, end_date):
+    with st.expander("🗑 일괄삭제", key="sec_delete", on_change="rerun") as sec:
+        if not sec.open:
+            return
+        from deletion import bulk_delete, count_selection, id_selection, parse_ids, recent_jobs, restore
+        from queries import LIVE_SQL
+
+        show_flash("delete")
+        del_target = st.radio("대상", ["ID 지정", "현재 필터 결과"], horizontal=True, key="del_target")
+        if del_target == "ID 지정":
+            id_spec = st.text_input("삭제할 ID (쉼표 구분, 범위는 a-b)", placeholder="예: 101,102,120-130")
+            try:
+                del_sql, del_params = id_selection(*parse_ids(id_spec))
+            except ValueError as e:
+                st.warning(str(e))
+                del_sql, del_params = "1=0", {}
+        else:
+            st.caption(f"{start_date} ~ {end_date} · 사이드바 필터(키워드 포함)와 일치하는 행 전체")
+            del_sql, del_params = where_sql, params
+        d1, d2 = st.columns([1, 2])
+        with d1:
+            soft = st.checkbox("삭제 표시만 (복구 가능)", value=SOFT_DELETE_READY, disabled=not SOFT_DELETE_READY,
+                               help=None if SOFT_DELETE_READY else "deleted_at 컬럼이 없습니다 — [🗄 스키마] 마이그레이션 후 사용")
+        with d2:
+            del_reason = st.text_input("사유", key="del_reason")
+        operator = current_operator()
+        if operator:
+            st.caption(f"실행자: {operator}")
+        else:   # 서버 프로세스 계정(USER)은 누가 실행했는지 알려주지 않으므로 직접 입력해야 실행
+            operator = st.text_input("실행자 (필수)", key="del_operator",
+                                     placeholder="이름 또는 이메일 — 감사 로그에 남습니다").strip() or None
         try:
-            id_list = [int(x.strip()) for x in ids.split(',') if x.strip()]
-            if not id_list:
-                st.warning("ID를 입력하세요.")
-            else:
-                with engine.begin() as conn:
-                    conn.execute(text("DELETE FROM incidents WHERE id IN :ids"), {"ids": tuple(id_list)})
-                st.success(f"삭제 완료: {len(id_list)}건")
-                st.cache_data.clear()
+            with db_conn() as conn:   # 삭제 표시는 이미 표시된 행을 건너뜀
+                del_cnt = count_selection(conn, f"({del_sql}) AND {LIVE_SQL}" if soft else del_sql, del_params)
         except Exception as e:
-            st.error(f"삭제 중 오류: {e}")
+            st.error(f"대상 건수 조회 오류: {e}")
+            del_cnt = 0
+        st.write(f"대상: **{del_cnt:,}건**")
+        # 확인 체크는 대상(조건/파라미터/방식/건수)별로 따로 → 대상이 바뀌거나 삭제가 끝나면 다시 확인해야 실행
+        del_sig = repr((del_sql, sorted(del_params.items()), soft, del_cnt))
+        confirm = st.checkbox(f"{del_cnt:,}건을 {'삭제 표시' if soft else '영구 삭제'}합니다",
+                              key=f"del_confirm:{del_sig}")
+        if st.button("삭제 실행", type="primary", disabled=not (del_cnt and confirm and operator)):
+            touched = []
+            bar = st.progress(0.0, text="삭제 중...")
+
+            def _on_batch(conn, started_ats):
+                if ROLLUP_READY:
+                    refresh_daily(conn, started_ats, SOFT_DELETE_READY)
+                touched.extend(started_ats)
+
+            try:
+                res = bulk_delete(engine, del_sql, del_params, soft=soft, actor=operator,
+                                  reason=del_reason, on_batch=_on_batch,
+                                  progress=lambda n, frac: bar.progress(frac or 0.0, text=f"{n:,}건 처리"))
+                msg = ("success", f"{'삭제 표시' if soft else '삭제'} 완료: {res['rows']:,}건 · "
+                                  f"작업 id `{res['job_id']}`")
+            except Exception as e:
+                msg = ("error", f"삭제 중 오류 ({len(touched):,}건까지 커밋됨): {e}")
+            if touched:
+                invalidate(touched)
+                rerun_app("delete", *msg)
+            getattr(st, msg[0])(msg[1])
+
+        if SOFT_DELETE_READY:
+            st.markdown("**복구** (삭제 표시 작업 되돌리기)")
+            r1, r2 = st.columns([3, 1])
+            with r1:
+                restore_job = st.text_input("작업 id", key="restore_job", label_visibility="collapsed",
+                                            placeholder="삭제 표시 작업 id")
+            with r2:
+                if st.button("복구", disabled=not (restore_job.strip() and operator)):
+                    touched = []
+
+                    def _on_restore(conn, started_ats):
+                        if ROLLUP_READY:
+                            refresh_daily(conn, started_ats, SOFT_DELETE_READY)
+                        touched.extend(started_ats)
+
+                    try:
+                        res = restore(engine, restore_job.strip(), actor=operator, on_batch=_on_restore)
+                        msg = ("success", f"복구 완료: {res['rows']:,}건"
+                                          + (f" (같은 내용이 이미 있어 중복제거 키 없이 복구 {res['unkeyed']:,}건)"
+                                             if res["unkeyed"] else ""))
+                    except Exception as e:
+                        msg = ("error", f"복구 중 오류: {e}")
+                    if touched:
+                        invalidate(touched)
+                        rerun_app("delete", *msg)
+                    getattr(st, msg[0])(msg[1])
+        try:
+            with db_conn() as conn:
+                jobs = recent_jobs(conn, 10)
+            if not jobs.empty:
+                st.dataframe(jobs, hide_index=True, use_container_width=True)
+        except Exception:
+            pass   # 감사 테이블은 첫 삭제 때 생성
+
+delete_section(where_sql, params, start_date, end_date)
 
 # ---------------------------
 # 오류추가 (웹에서 직접 입력)
 # ---------------------------
-with st.expander("➕ 오류추가"):
-    st.caption("아래 항목을 입력 후 [저장]을 누르면 DB에 바로 추가됩니다.")
-    with st.form("add_incident_form", clear_on_submit=False):
-        # 기본 시간 입력
-        now = datetime.now().replace(second=0, microsecond=0)
-        c1, c2, c3, c4 = st.columns(4)
-        with c1:
-            s_date = st.date_input("시작일", value=now.date(), key="s_date_in_form")
-        with c2:
-            s_time = st.time_input("시작시간", value=now.time(), key="s_time_in_form")
-        with c3:
-            use_end = st.checkbox("종료일시 입력", value=False, key="use_end_endtime")
-        with c4:
-            duration = st.text_input("장애시간(예: 2h 30m / 45m)", placeholder="선택")
-
-        if use_end:
-            c5, c6 = st.columns(2)
-            with c5:
-                e_date = st.date_input("종료일", value=now.date(), key="e_date_in_form")
-            with c6:
-                e_time = st.time_input("종료시간", value=now.time(), key="e_time_in_form")
-        else:
-            e_date, e_time = None, None
-
-        # 분류/메타
-        c7, c8, c9, c10 = st.columns(4)
-        with c7:
-            platform = st.selectbox("플랫폼", options=(["ALL"] + [x for x in PLATFORMS if x]))
-        with c8:
-            locale = st.selectbox("로케일", options=(["KR","JP","US","ALL"] + [x for x in LOCALES if x not in ["KR","JP","US","ALL"]]))
-        with c9:
-            inquiry_count = st.number_input("문의량", min_value=0, step=1, value=0)
-        with c10:
-            category = st.selectbox("카테고리", options=CATEGORIES)
-
-        # 본문
-        description = st.text_area("장애 내용 (필수)", height=120, placeholder="무슨 현상이 언제/어디서 발생했는지")
-        cause       = st.text_area("원인", height=100, placeholder="원인 분석/추정")
-        response    = st.text_area("대응", height=100, placeholder="조치 내역/연표")
-        note        = st.text_area("비고", height=80, placeholder="관련 링크 등")
-
-        saved = st.form_submit_button("저장", type="primary")
+@fragment
+def add_section():
+    with st.expander("➕ 오류추가", key="sec_add", on_change="rerun") as sec:
+        if not sec.open:
+            return
+        show_flash("add")
+        st.caption("아래 항목을 입력 후 [저장]을 누르면 DB에 바로 추가됩니다.")
+        with st.form("add_incident_form", clear_on_submit=False):
+            # 기본 시간 입력
+            now = datetime.now().replace(second=0, microsecond=0)
+            c1, c2, c3, c4 = st.columns(4)
+            with c1:
+                s_date = st.date_input("시작일", value=now.date(), key="s_date_in_form")
+            with c2:
+                s_time = st.time_input("시작시간", value=now.time(), key="s_time_in_form")
+            with c3:
+                use_end = st.checkbox("종료일시 입력", value=False, key="use_end_endtime")
+            with c4:
+                duration = st.text_input("장애시간(예: 2h 30m / 45m)", placeholder="선택")
+
+            if use_end:
+                c5, c6 = st.columns(2)
+                with c5:
+                    e_date = st.date_input("종료일", value=now.date(), key="e_date_in_form")
+                with c6:
+                    e_time = st.time_input("종료시간", value=now.time(), key="e_time_in_form")
+            else:
+                e_date, e_time = None, None
+
+            # 분류/메타
+            c7, c8, c9, c10 = st.columns(4)
+            with c7:
+                platform = st.selectbox("플랫폼", options=(["ALL"] + [x for x in PLATFORMS if x]))
+            with c8:
+                locale = st.selectbox("로케일", options=(["KR","JP","US","ALL"] + [x for x in LOCALES if x not in ["KR","JP","US","ALL"]]))
+            with c9:
+                inquiry_count = st.number_input("문의량", min_value=0, step=1, value=0)
+            with c10:
+                category = st.selectbox("카테고리", options=CATEGORIES)
+
+            # 본문
+            description = st.text_area("장애 내용 (필수)", height=120, placeholder="무슨 현상이 언제/어디서 발생했는지")
+            cause       = st.text_area("원인", height=100, placeholder="원인 분석/추정")
+            response    = st.text_area("대응", height=100, placeholder="조치 내역/연표")
+            note        = st.text_area("비고", height=80, placeholder="관련 링크 등")
+
+            saved = st.form_submit_button("저장", type="primary")
 
         if saved:
             # 유효성 체크
@@ -485,69 +1158,277 @@ with st.expander("➕ 오류추가"):
             if errors:
                 for msg in errors:
                     st.error(msg)
-            else:
-                try:
-                    payload = {
-                        "started_at": started_at,
-                        "ended_at": ended_at,
-                        "duration": duration.strip() or None,
-                        "platform": platform,
-                        "locale": locale,
-                        "inquiry_count": int(inquiry_count) if inquiry_count is not None else 0,
-                        "category": category,
-                        "description": description.strip(),
-                        "cause": cause.strip() or None,
-                        "response": response.strip() or None,
-                        "note": note.strip() or None,
-                    }
-                    with engine.begin() as conn:
+                return
+            try:
+                payload = {
+                    "started_at": started_at,
+                    "ended_at": ended_at,
+                    "duration": duration.strip() or None,
+                    "platform": platform,
+                    "locale": locale,
+                    "inquiry_count": int(inquiry_count) if inquiry_count is not None else 0,
+                    "category": category,
+                    "description": description.strip(),
+                    "cause": cause.strip() or None,
+                    "response": response.strip() or None,
+                    "note": note.strip() or None,
+                }
+                if DURATION_READY:
+                    m = duration_minutes(pd.DataFrame([payload])).iloc[0]
+                    payload["duration_minutes"] = None if pd.isna(m) else int(m)
+                dedup = dedup_ready()
+                if dedup:
+                    payload["content_key"] = content_keys(pd.DataFrame([payload])).iloc[0]
+                cols = list(payload)
+                with engine.begin() as conn:
+                    dup_id = None
+                    if dedup:
+                        dup_id = conn.execute(text("SELECT id FROM incidents WHERE content_key = :k"),
+                                              {"k": payload["content_key"]}).scalar()
+                    if dup_id is None:
                         conn.execute(
-                            text("""
-                                INSERT INTO incidents
-                                (started_at, ended_at, duration, platform, locale, inquiry_count,
-                                 category, description, cause, response, note)
-                                VALUES
-                                (:started_at, :ended_at, :duration, :platform, :locale, :inquiry_count,
-                                 :category, :description, :cause, :response, :note)
-                            """),
+                            text(f"INSERT INTO incidents ({', '.join(cols)}) "
+                                 f"VALUES ({', '.join(':' + c for c in cols)})"),
                             payload
                         )
-                    st.success("오류 현황이 저장되었습니다 ✅")
-                    st.cache_data.clear()
-                except Exception as e:
-                    st.error(f"저장 중 오류가 발생했습니다: {e}")
+                        if ROLLUP_READY:
+                            refresh_daily(conn, [started_at], SOFT_DELETE_READY)
+            except Exception as e:
+                st.error(f"저장 중 오류가 발생했습니다: {e}")
+                return
+            if dup_id is not None:
+                st.warning(f"같은 내용의 장애가 이미 등록되어 있습니다 (ID {dup_id}). 저장하지 않았습니다.")
+            else:
+                invalidate([started_at])
+                rerun_app("add", "success", "오류 현황이 저장되었습니다 ✅")
+
+add_section()
 
 # ---------------------------
 # 파일업로드 (CSV/엑셀)
 # ---------------------------
-with st.expander("⬆️ 파일업로드"):
-    st.caption("가능한 컬럼: started_at, ended_at, duration, platform, locale, inquiry_count, category, description, cause, response, note")
-    file = st.file_uploader("파일 선택", type=["csv", "xlsx", "xls"])
-
-    def normalize_df(df: pd.DataFrame) -> pd.DataFrame:
-        df.columns = [str(c).strip().lower() for c in df.columns]
-        for dt in ["started_at", "ended_at"]:
-            if dt in df.columns:
-                df[dt] = pd.to_datetime(df[dt], errors="coerce")
-        if "inquiry_count" in df.columns:
-            df["inquiry_count"] = pd.to_numeric(df["inquiry_count"], errors="coerce")
-        for col in ["ended_at","duration","platform","locale","inquiry_count","cause","response","note"]:
-            if col not in df.columns:
-                df[col] = None
-        required = ["started_at", "category", "description"]
-        missing = [c for c in required if c not in df.columns]
-        if missing:
-            raise ValueError(f"필수 컬럼 누락: {missing}")
-        return df[["started_at","ended_at","duration","platform","locale","inquiry_count",
-                   "category","description","cause","response","note"]]
-
-    if file is not None:
-        try:
-            up = pd.read_csv(file) if file.name.lower().endswith(".csv") else pd.read_excel(file)
-            up = normalize_df(up)
-            with engine.begin() as conn:
-                up.to_sql("incidents", conn, if_exists="append", index=False)
-            st.success(f"업로드 완료: {len(up)}건")
-            st.cache_data.clear()
-        except Exception as e:
-            st.error(f"업로드 실패: {e}")
+@fragment
+def upload_section():
+    with st.expander("⬆️ 파일업로드", key="sec_upload", on_change="rerun") as sec:
+        if not sec.open:
+            return
+        from importer import DEFAULT_BATCH_SIZE, file_fingerprint, stream_import
+
+        show_flash("upload")
+        st.caption("가능한 컬럼: started_at, ended_at, duration, platform, locale, inquiry_count, category, description, cause, response, note")
+        file = st.file_uploader("파일 선택", type=["csv", "xlsx", "xls"])
+        batch_size = st.number_input("배치 크기(행)", min_value=100, max_value=20000,
+                                     value=DEFAULT_BATCH_SIZE, step=100)
+        if dedup_ready():
+            mode_label = st.radio("중복 처리", ["갱신(upsert)", "건너뛰기"], horizontal=True,
+                                  help="시작시각/플랫폼/로케일/카테고리/내용이 같은 행을 중복으로 봅니다.")
+            import_mode = "upsert" if mode_label.startswith("갱신") else "skip"
+        else:
+            import_mode = "append"
+            st.caption("중복제거 키(content_key)가 없어 모든 행을 그대로 추가합니다. 아래 [중복제거 키]에서 생성할 수 있습니다.")
+
+        if file is None:
+            return
+        # 배치마다 커밋되므로 실패해도 커밋된 행 수를 기억해 두고 재실행 시 이어서 적재 (끝까지 적재하면 지움)
+        #  - 키는 파일 내용 기준: 이름/크기가 같은 다른 파일은 처음부터
+        offsets = st.session_state.setdefault("upload_offsets", {})
+        file_key = file_fingerprint(file)
+        done = offsets.get(file_key, 0)
+        if done:
+            st.info(f"이 파일은 {done:,}행까지 적재되었습니다. 다시 실행하면 이후 행부터 이어서 적재합니다.")
+
+        if st.button("업로드 실행", type="primary"):
+            touched = []
+            bar = st.progress(0.0, text="업로드 중...")
+
+            def _on_batch(conn, batch):
+                if ROLLUP_READY:
+                    refresh_daily(conn, batch["started_at"], SOFT_DELETE_READY)
+                touched.extend(batch["started_at"].dropna())
+
+            def _progress(rows, frac):
+                offsets[file_key] = rows
+                bar.progress(frac if frac is not None else 0.0, text=f"{rows:,}행 적재")
+
+            try:
+                file.seek(0)
+                res = stream_import(engine, file, file.name, int(batch_size), done,
+                                    on_batch=_on_batch, progress=_progress, mode=import_mode)
+                bar.progress(1.0, text=f"{res['rows']:,}행 적재")
+                offsets.pop(file_key, None)   # 같은 파일을 다시 올리면 처음부터 (upsert/건너뛰기로 중복 처리)
+                msg = ("success", f"업로드 완료: 추가 {res['inserted']:,}건 · 갱신 {res['updated']:,}건 · "
+                                  f"중복 건너뜀 {res['skipped']:,}건")
+            except Exception as e:
+                msg = ("error", f"업로드 실패 ({offsets.get(file_key, 0):,}행까지 커밋됨): {e}")
+            if touched:
+                invalidate(touched)
+                rerun_app("upload", *msg)
+            getattr(st, msg[0])(msg[1])
+
+upload_section()
+
+# ---------------------------
+# 스키마/집계 관리 (검색 인덱스, 일별 집계, 중복제거 키, 장애시간, 스키마)
+#  - 결과가 화면 전체(요약 경로/KPI/경고)에 영향을 주므로 성공하면 전체 rerun
+# ---------------------------
+@fragment
+def admin_sections():
+    # 검색 인덱스 (키워드 필터용 FULLTEXT)
+    with st.expander("🔎 검색 인덱스", key="sec_fulltext", on_change="rerun") as sec:
+        if sec.open:
+            show_flash("fulltext")
+            token_size = get_fulltext_token_size()
+            if token_size:
+                st.caption(f"FULLTEXT 인덱스 사용 중 (ngram_token_size={token_size}). 키워드 검색은 인덱스로 후보를 찾습니다.")
+            else:
+                st.caption("FULLTEXT 인덱스가 없어 키워드 검색이 전체 스캔(LIKE)으로 동작합니다.")
+                if st.button("인덱스 생성 (ngram)"):
+                    try:
+                        with st.spinner("인덱스 생성 중..."):
+                            create_fulltext_index()
+                    except Exception as e:
+                        st.error(f"인덱스 생성 실패: {e}")
+                    else:
+                        rerun_app("fulltext", "success", "인덱스 생성 완료")
+
+    # 일별 집계 재구축/복구
+    with st.expander("🧮 일별 집계", key="sec_rollup", on_change="rerun") as sec:
+        if sec.open:
+            show_flash("rollup")
+            if not ROLLUP_READY:
+                st.caption("incidents_daily 테이블을 사용할 수 없어 요약을 원본 테이블에서 집계합니다."
+                           + (f" ({ROLLUP_ERROR})" if ROLLUP_ERROR else ""))
+            else:
+                st.caption("요약(KPI/카테고리/플랫폼)은 키워드 필터가 없을 때 incidents_daily에서 읽습니다. "
+                           "DB를 직접 수정한 경우 해당 기간을 재구축하세요.")
+                today = datetime.now().date()
+                r1, r2 = st.columns(2)
+                with r1:
+                    rb_from = st.date_input("재구축 시작일", value=today - timedelta(days=30), key="rb_from")
+                with r2:
+                    rb_to   = st.date_input("재구축 종료일", value=today, key="rb_to")
+                b1, b2 = st.columns(2)
+                with b1:
+                    rb_range = st.button("기간 재구축")
+                with b2:
+                    rb_all   = st.button("전체 재구축")
+                if rb_range or rb_all:
+                    try:
+                        bar = st.progress(0.0)
+                        n = rebuild_daily(engine, None if rb_all else rb_from, None if rb_all else rb_to,
+                                          progress=bar.progress)
+                    except Exception as e:
+                        st.error(f"재구축 실패: {e}")
+                    else:
+                        fetch_summary.clear()   # 집계 테이블을 읽는 것은 요약 + 차원 카탈로그
+                        get_catalog.clear()
+                        rerun_app("rollup", "success", f"재구축 완료: {n}개월")
+
+    # 중복제거 키 (content_key) 마이그레이션
+    with st.expander("🧬 중복제거 키", key="sec_dedup", on_change="rerun") as sec:
+        if sec.open:
+            show_flash("dedup")
+            if dedup_ready():
+                st.caption("content_key 사용 중: 업로드/입력 시 같은 내용의 장애는 갱신하거나 건너뜁니다.")
+            else:
+                st.caption("incidents에 content_key 컬럼/UNIQUE 인덱스를 추가하고 기존 행의 키를 채웁니다. "
+                           "이미 중복된 행은 키 없이 남겨 두며 건수를 알려 줍니다.")
+                if st.button("키 생성/백필"):
+                    from importer import migrate_content_key
+                    try:
+                        bar = st.progress(0.0)
+                        res = migrate_content_key(engine, progress=bar.progress)
+                    except Exception as e:
+                        st.error(f"마이그레이션 실패: {e}")
+                    else:
+                        dedup_ready.clear()
+                        rerun_app("dedup", "success",
+                                  f"완료: {res['keyed']:,}건 키 생성 · 기존 중복 {res['duplicates']:,}건")
+
+    # 장애시간(분) (duration_minutes) 마이그레이션
+    with st.expander("🕒 장애시간", key="sec_duration", on_change="rerun") as sec:
+        if sec.open:
+            show_flash("duration")
+            st.caption("duration(예: 2h 30m / 45분 / 1:30)을 분 단위로 해석하고, 없으면 종료-시작 시각으로 계산해 "
+                       "duration_minutes에 저장합니다. 신규 입력/업로드는 자동으로 채워집니다.")
+            if st.button("컬럼 생성/백필" if not DURATION_READY else "미기록 행 다시 계산"):
+                from importer import migrate_duration
+                try:
+                    bar = st.progress(0.0)
+                    res = migrate_duration(engine, progress=bar.progress)
+                except Exception as e:
+                    st.error(f"마이그레이션 실패: {e}")
+                else:
+                    duration_ready.clear()
+                    fetch_impact.clear()
+                    rerun_app("duration", "success",
+                              f"완료: {res['filled']:,}건 계산 · 해석 불가 {res['unparsed']:,}건")
+
+    # 스키마 / 인덱스
+    with st.expander("🗄 스키마", key="sec_schema", on_change="rerun") as sec:
+        if sec.open:
+            from schema import migrate
+
+            show_flash("schema")
+            st.caption("incidents 테이블과 대시보드용 인덱스를 점검/생성합니다. (python schema.py 와 동일)")
+            st.dataframe(pd.DataFrame([
+                {"인덱스": name, "컬럼": ", ".join(cols), "상태": "누락/변경" if name in schema_state["missing"] else "OK"}
+                for name, cols in INDEXES.items()
+            ]), hide_index=True, use_container_width=True)
+            if schema_state["error"]:
+                st.caption(f"점검 실패: {schema_state['error']}")
+            for w in schema_state["warnings"]:
+                st.caption(f"⚠️ {w}")
+            if st.button("마이그레이션 실행"):
+                try:
+                    with st.spinner("DDL 실행 중..."):
+                        ran = migrate(engine, log=lambda msg: st.code(msg, language="sql"))
+                except Exception as e:
+                    st.error(f"마이그레이션 실패: {e}")
+                else:
+                    schema_report.clear()
+                    duration_ready.clear()
+                    soft_delete_ready.clear()
+                    rerun_app("schema", "success", f"완료: DDL {len(ran)}건")
+
+admin_sections()
+
+lap("관리 섹션")
+
+# ---------------------------
+# 성능 프로파일 (쿼리 지연/행수, 캐시 hit/miss, 구간별 시간, 실행 시간)
+#  - 실행 시간: cold = 프로세스 첫 실행(import/첫 연결 포함), rerun = 이후 전체 실행, fragment:이름 = 섹션만 실행
+# ---------------------------
+@fragment
+def profiler_section():
+    with st.expander("⏱ 성능", key="sec_profiler", on_change="rerun") as sec:
+        if not sec.open:
+            return
+        scope = st.radio("범위", ["이번 실행", "최근 전체"], horizontal=True, key="prof_scope")
+        rec = records(run_id if scope == "이번 실행" else None)
+        if rec.empty:
+            st.caption("기록이 없습니다.")
+        else:
+            rep = summarize(rec)
+            st.caption("구간별 시간(ms) — 쿼리(MySQL) / 캐시 함수(쿼리+pandas) / 목록 렌더(AgGrid 직렬화) 비교")
+            st.dataframe(rep["sections"], hide_index=True, use_container_width=True)
+            st.caption("캐시 함수: 호출/적중, 결과 크기(bytes, miss 시 측정)")
+            st.dataframe(rep["cache"], hide_index=True, use_container_width=True)
+            st.caption("SQL: 호출 함수별 지연시간/반환 행수")
+            st.dataframe(rep["queries"], hide_index=True, use_container_width=True)
+            st.download_button("JSON lines 내보내기", to_jsonl(rec), file_name=f"profile_{run_id}.jsonl",
+                               mime="application/x-ndjson")
+        runs = summarize(records())["runs"]
+        if not runs.empty:
+            st.caption("실행 시간(ms): cold = 프로세스 첫 실행(import·첫 연결 포함) / rerun = 전체 실행 / "
+                       "fragment:이름 = 해당 섹션만 실행")
+            st.dataframe(runs, hide_index=True, use_container_width=True)
+        st.caption("조회 캐시(SWR): 적중/만료 후 즉시 응답(stale)/대기 조회(miss)/합류(coalesced)/백그라운드 갱신")
+        st.dataframe(pd.DataFrame([cache_stats(swr_cache())]), hide_index=True, use_container_width=True)
+        st.caption("커넥션 풀: 현재 상태 + 누적 체크아웃/신규 연결/유휴 ping/대기시간(ms)")
+        st.dataframe(pd.DataFrame([pool_stats(engine)]), hide_index=True, use_container_width=True)
+
+if PROFILER:
+    profiler_section()
+
+end_run()
@@ -0,0 +1,109 @@
+# bench/postprocess.py
+# 목록 후처리 마이크로 벤치마크: 긴 한국어 텍스트 5000행 기준
+#   legacy  : 기존 fetch_list 후처리 (행 단위 lambda, str.replace 2회, desc_one 2회 + copy)
+#   python  : 같은 일을 벡터화로 (원문 컬럼까지 받아 pandas에서 첫 줄 계산)
+#   current : 현재 앱 경로 (desc_one은 SQL에서 계산, 요약 컬럼만 후처리)
+# 실행: python bench/postprocess.py [--rows 5000] [--repeat 20]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from queries import first_line, format_dt, format_list, normalize_newlines  # noqa: E402
+
+TEXT_COLS = ["description", "cause", "response", "note"]
+WORDS = ["결제", "오류", "로그인", "지연", "서버", "점검", "앱", "업데이트", "이미지", "로딩", "실패", "발생",
+         "사용자", "문의", "증가", "원인", "파악", "중", "조치", "완료", "재배포", "캐시", "장애"]
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rnd = random.Random(seed)
+
+    def para():
+        lines = [" ".join(rnd.choices(WORDS, k=rnd.randint(8, 30))) for _ in range(rnd.randint(1, 6))]
+        return rnd.choice(["\r\n", "\n", "\r"]).join(lines)
+
+    started = pd.Timestamp("2024-01-01") + pd.to_timedelta(np.sort(np.random.default_rng(seed).integers(0, 3e7, rows)), unit="s")
+    ended = pd.Series(started + pd.Timedelta(minutes=45)).where(np.arange(rows) % 3 != 0)
+    df = pd.DataFrame({
+        "id": np.arange(rows, 0, -1),
+        "started_at": started,
+        "ended_at": ended,
+        "duration": "45m",
+        "platform": rnd.choices(["레진", "발코니", "델리툰"], k=rows),
+        "locale": "KR",
+        "inquiry_count": 3,
+        "category": "결제",
+    })
+    for col in TEXT_COLS:
+        df[col] = [para() for _ in range(rows)]
+    return df
+
+
+def legacy(df: pd.DataFrame) -> pd.DataFrame:
+    df["started_at"] = pd.to_datetime(df["started_at"]).dt.strftime("%Y-%m-%d %H:%M")
+    df["ended_at"]   = df["ended_at"].apply(lambda x: "" if pd.isna(x) else pd.to_datetime(x).strftime("%Y-%m-%d %H:%M"))
+    for col in TEXT_COLS:
+        df[col] = df[col].astype(str).str.replace("\r\n", "\n").str.replace("\r", "\n")
+    df["desc_one"] = df["description"].astype(str).str.split("\n").str[0]
+    md_df = df.copy()
+    md_df["desc_one"] = md_df["description"].astype(str).str.split("\n").str[0]
+    return md_df
+
+
+def python_vectorized(df: pd.DataFrame) -> pd.DataFrame:
+    df["started_at"] = format_dt(df["started_at"])
+    df["ended_at"]   = format_dt(df["ended_at"])
+    df["desc_one"]   = first_line(df["description"])
+    for col in TEXT_COLS:
+        df[col] = normalize_newlines(df[col])
+    return df
+
+
+def current(df: pd.DataFrame) -> pd.DataFrame:
+    return format_list(df)
+
+
+def timeit(fn, frame: pd.DataFrame, repeat: int) -> list[float]:
+    out = []
+    for _ in range(repeat):
+        df = frame.copy()   # 입력 준비(read_sql 결과에 해당)는 측정에서 제외
+        t0 = time.perf_counter()
+        fn(df)
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    wide = make_frame(args.rows)
+    narrow = wide.drop(columns=TEXT_COLS).assign(desc_one=first_line(wide["description"]))
+
+    # 결과 동일성 확인
+    a, b, c = legacy(wide.copy()), python_vectorized(wide.copy()), current(narrow.copy())
+    for col in ["started_at", "ended_at", "desc_one"]:
+        assert a[col].tolist() == b[col].tolist() == c[col].tolist(), col
+    for col in TEXT_COLS:
+        assert a[col].tolist() == b[col].tolist(), col
+
+    print(f"rows={args.rows} repeat={args.repeat}")
+    base = None
+    for name, fn, frame in [("legacy", legacy, wide), ("python", python_vectorized, wide), ("current", current, narrow)]:
+        ts = timeit(fn, frame, args.repeat)
+        p50 = float(np.median(ts)) * 1000
+        base = base or p50
+        print(f"{name:8s} p50={p50:8.2f} ms  min={min(ts) * 1000:8.2f} ms  x{base / p50:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
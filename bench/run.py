@@ -0,0 +1,176 @@
+# bench/run.py
+# 대시보드 데이터 경로 벤치마크 (로컬 SQLite 스탠드인 + 합성 데이터)
+#  - queries.py의 run_* 함수(앱 캐시 함수가 부르는 것과 동일)를 필터 조합별로 실행
+#    기간(7일/30일/1년/전체) × 선택(없음/플랫폼/플랫폼+카테고리/로케일) + 키워드(LIKE 경로), 목록 limit 500/5000, 추이, 장애시간 집계
+#  - 업로드 경로: importer.stream_import(append) 로 합성 CSV를 빈 DB에 적재
+#  - 케이스별 p50/p95 지연시간(ms)과 피크 메모리(tracemalloc, 1회 별도 측정)
+#  - --baseline 이전 결과(JSON)와 비교해 p95가 tolerance배를 넘으면 종료코드 1 (배포 전 회귀 확인)
+# 실행: python bench/run.py [--rows 1000000] [--repeat 5] [--out result.json] [--baseline base.json]
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from importer import stream_import  # noqa: E402
+from queries import (build_filters, keyword_clause, run_catalog, run_detail, run_impact,  # noqa: E402
+                     run_list, run_page, run_summary, run_trend, trend_bucket, where_sqls)
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from standin import create_schema, sqlite_engine  # noqa: E402
+from synth import END, csv_bytes, load  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+WINDOWS = {"7d": 7, "30d": 30, "1y": 365, "all": None}
+SELECTIONS = {
+    "none":     {},
+    "pf":       {"platforms": ["레진"]},
+    "pf+cat":   {"platforms": ["레진", "발코니"], "categories": ["결제", "로그인"]},
+    "locale":   {"locales": ["JP"]},
+}
+KEYWORDS = {"kw": "결제 오류"}
+
+
+def measure(fn, repeat: int) -> dict:
+    """1회 tracemalloc 피크 측정 + repeat회 시간 측정."""
+    tracemalloc.start()
+    res = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    ts = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        ts.append((time.perf_counter() - t0) * 1000)
+    rows = len(res[0] if isinstance(res, tuple) else res) if res is not None else None
+    return {"p50_ms": round(float(np.percentile(ts, 50)), 2), "p95_ms": round(float(np.percentile(ts, 95)), 2),
+            "peak_kb": round(peak / 1024, 1), "rows": rows}
+
+
+def cases(engine, first_day: datetime):
+    """(케이스명, 호출) 목록. 앱처럼 호출마다 연결을 새로 연다."""
+    def q(fn, *args, **kw):
+        def call():
+            with engine.connect() as conn:
+                return fn(conn, *args, **kw)
+        return call
+
+    now = END
+    out = [("catalog", q(run_catalog)), ("catalog.rollup", q(run_catalog, True))]
+    combos = [(w, s, "") for w in WINDOWS for s in SELECTIONS]
+    combos += [(w, "none", k) for w in ("30d", "all") for k in KEYWORDS]
+    for w, s, k in combos:
+        days = WINDOWS[w]
+        d_from = now - timedelta(days=days) if days else first_day
+        sel = SELECTIONS[s]
+        kw = keyword_clause(KEYWORDS[k], 0) if k else ("", {})   # FULLTEXT 없음 → LIKE 경로
+        params, filters = build_filters(d_from, now, sel.get("platforms", ()), sel.get("locales", ()),
+                                        sel.get("categories", ()), kw)
+        filter_sql, where_sql = where_sqls(filters)
+        name = f"{w}/{s}" + (f"/{k}" if k else "")
+        out.append((f"summary       {name}", q(run_summary, filter_sql, params, False, now)))
+        if not k:
+            out.append((f"summary.rollup {name}", q(run_summary, filter_sql, params, True, now)))
+        bucket = trend_bucket(d_from, now)
+        out.append((f"trend         {name}", q(run_trend, filter_sql, params, bucket, "category")))
+        if not k and bucket != "hour":
+            out.append((f"trend.rollup  {name}", q(run_trend, filter_sql, params, bucket, "category", True)))
+        out.append((f"impact        {name}", q(run_impact, where_sql, params)))
+        for limit in (500, 5000):
+            out.append((f"list{limit:<5d}     {name}", q(run_list, where_sql, params, limit)))
+        out.append((f"page1         {name}", q(run_page, where_sql, params, None, 50)))
+        with engine.connect() as conn:
+            _, cursor = run_page(conn, where_sql, params, None, 50)
+        if cursor:
+            out.append((f"page2         {name}", q(run_page, where_sql, params, cursor, 50)))
+    with engine.connect() as conn:
+        max_id = conn.execute(text("SELECT MAX(id) FROM incidents")).scalar() or 1
+    ids = np.random.default_rng(0).integers(1, max_id + 1, 32).tolist()
+    out.append(("detail", q(lambda conn: [run_detail(conn, i) for i in ids])))
+    return out
+
+
+def bench_upload(rows: int, batch_size: int) -> dict:
+    """합성 CSV를 빈 (메모리) DB에 append 모드로 적재. skip/upsert는 MySQL 전용 구문이라 제외."""
+    buf = csv_bytes(rows)
+
+    def call():
+        engine = sqlite_engine(":memory:")
+        create_schema(engine)
+        buf.seek(0)
+        return stream_import(engine, buf, "bench.csv", batch_size=batch_size)
+
+    res = measure(call, 2)
+    res["rows"] = rows
+    res["rows_per_s"] = round(rows / (res["p50_ms"] / 1000))
+    return res
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    bad = []
+    for name, cur in result["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if base and cur["p95_ms"] > base["p95_ms"] * tolerance and cur["p95_ms"] - base["p95_ms"] > 1:
+            bad.append(f"{name}: p95 {base['p95_ms']} → {cur['p95_ms']} ms")
+    return bad
+
+
+def main():
+    ap = argparse.ArgumentParser(description="대시보드 쿼리/업로드 경로 벤치마크 (SQLite 스탠드인)")
+    ap.add_argument("--db", default=os.path.join(HERE, "incidents.db"))
+    ap.add_argument("--rows", type=int, default=1_000_000, help="DB가 없거나 --regen일 때 생성할 행 수")
+    ap.add_argument("--regen", action="store_true", help="DB 재생성")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", default="", help="케이스명에 이 문자열이 들어간 것만")
+    ap.add_argument("--upload-rows", type=int, default=50_000, help="0이면 업로드 벤치마크 생략")
+    ap.add_argument("--batch-size", type=int, default=1000)
+    ap.add_argument("--out", help="결과 JSON 저장 경로")
+    ap.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    ap.add_argument("--tolerance", type=float, default=1.25, help="p95 허용 배율")
+    args = ap.parse_args()
+
+    if args.regen and os.path.exists(args.db):
+        os.remove(args.db)
+    engine = sqlite_engine(args.db)
+    if not os.path.exists(args.db) or os.path.getsize(args.db) == 0:
+        load(engine, args.rows)
+    with engine.connect() as conn:
+        total, first = conn.execute(text("SELECT COUNT(*), MIN(started_at) FROM incidents")).one()
+    first_day = datetime.fromisoformat(str(first)[:19])
+
+    result = {"ts": datetime.now().isoformat(timespec="seconds"), "rows": total, "repeat": args.repeat, "cases": {}}
+    print(f"rows={total:,} repeat={args.repeat}")
+    print(f"{'case':40s} {'p50 ms':>9s} {'p95 ms':>9s} {'peak KB':>9s} {'rows':>6s}")
+    for name, call in cases(engine, first_day):
+        if args.only not in name:
+            continue
+        r = measure(call, args.repeat)
+        result["cases"][name] = r
+        print(f"{name:40s} {r['p50_ms']:9.1f} {r['p95_ms']:9.1f} {r['peak_kb']:9.0f} {r['rows'] or '':>6}")
+    if args.upload_rows and args.only in "upload":
+        r = result["cases"]["upload"] = bench_upload(args.upload_rows, args.batch_size)
+        print(f"{'upload':40s} {r['p50_ms']:9.1f} {r['p95_ms']:9.1f} {r['peak_kb']:9.0f} "
+              f"{r['rows']:>6}  ({r['rows_per_s']:,} rows/s)")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=1)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            bad = compare(result, json.load(f), args.tolerance)
+        for b in bad:
+            print(f"[회귀] {b}")
+        if bad:
+            sys.exit(1)
+        print("회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# bench/standin.py
+# 벤치마크용 로컬 DB (SQLite) — MySQL 대신 같은 쿼리를 돌리기 위한 최소 호환층
+#  - SUBSTRING_INDEX/DATE_FORMAT 등 앱 쿼리가 쓰는 MySQL 함수를 파이썬 함수로 등록
+#  - incidents / incidents_daily / incidents_dims / incidents_audit / incidents_meta 테이블 + schema.INDEXES 와 같은 인덱스
+#  - information_schema.columns(컬럼 유무 확인)는 sqlite_master + pragma_table_info 로 바꿔 실행
+#  - SELECT ... FOR UPDATE는 잠금 절을 떼고 실행 (SQLite는 쓰기 트랜잭션이 DB 전체를 잠금)
+#  - FULLTEXT/ON DUPLICATE KEY 등 MySQL 전용 기능은 없음 (키워드는 LIKE 경로, 업로드는 append 모드로 측정)
+
+import os
+import sys
+from datetime import datetime
+
+from sqlalchemy import create_engine, event, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schema import INDEXES  # noqa: E402
+
+SQLITE_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS incidents (
+        id             INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at     TIMESTAMP,
+        ended_at       TIMESTAMP,
+        duration       VARCHAR(100),
+        platform       VARCHAR(100),
+        locale         VARCHAR(100),
+        inquiry_count  INTEGER DEFAULT 0,
+        category       VARCHAR(100),
+        description    TEXT,
+        cause          TEXT,
+        response       TEXT,
+        note           TEXT,
+        content_key    CHAR(40),
+        duration_minutes INTEGER,
+        deleted_at     TIMESTAMP,
+        created_at     TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS incidents_daily (
+        day          DATE         NOT NULL,
+        platform     VARCHAR(100) NOT NULL DEFAULT '',
+        locale       VARCHAR(100) NOT NULL DEFAULT '',
+        category     VARCHAR(100) NOT NULL DEFAULT '',
+        cnt          INTEGER      NOT NULL,
+        inquiry_sum  INTEGER      NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, platform, locale, category)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS incidents_audit (
+        id           INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id       CHAR(32)     NOT NULL,
+        action       VARCHAR(20)  NOT NULL,
+        incident_id  INTEGER      NOT NULL,
+        started_at   TIMESTAMP,
+        row_json     TEXT,
+        actor        VARCHAR(100),
+        reason       VARCHAR(255),
+        created_at   TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS incidents_meta (
+        name        VARCHAR(50)  NOT NULL PRIMARY KEY,
+        value       VARCHAR(255),
+        updated_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS incidents_dims (
+        dim    VARCHAR(20)  NOT NULL,
+        value  VARCHAR(100) NOT NULL,
+        cnt    INTEGER      NOT NULL DEFAULT 0,
+        PRIMARY KEY (dim, value)
+    )
+    """,
+]
+
+
+def substring_index(s, delim, count):
+    if s is None:
+        return None
+    parts = str(s).split(delim)
+    return delim.join(parts[:count]) if count >= 0 else delim.join(parts[count:])
+
+
+MYSQL_TO_PY_FORMAT = {"%x": "%G", "%v": "%V"}
+
+
+def date_format(value, fmt):
+    """MySQL DATE_FORMAT 대용 (trend_sql이 쓰는 %Y %m %d %H %x %v 만)."""
+    if value is None:
+        return None
+    for k, v in MYSQL_TO_PY_FORMAT.items():
+        fmt = fmt.replace(k, v)
+    return datetime.fromisoformat(str(value)[:19]).strftime(fmt)
+
+
+# information_schema.columns 대용 (DATABASE() = 'main')
+COLUMNS_SQL = ("(SELECT 'main' AS table_schema, m.name AS table_name, p.name AS column_name "
+               "FROM sqlite_master m JOIN pragma_table_info(m.name) p WHERE m.type = 'table')")
+
+
+def sqlite_engine(path: str = ":memory:"):
+    url = "sqlite://" if path == ":memory:" else f"sqlite:///{path}"
+    engine = create_engine(url)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        dbapi_conn.create_function("SUBSTRING_INDEX", 3, substring_index, deterministic=True)
+        dbapi_conn.create_function("DATE_FORMAT", 2, date_format, deterministic=True)
+        dbapi_conn.create_function("DATABASE", 0, lambda: "main")
+        dbapi_conn.create_function("GET_LOCK", 2, lambda name, wait: 1)   # 단일 프로세스 측정용
+        dbapi_conn.create_function("RELEASE_LOCK", 1, lambda name: 1)
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+        dbapi_conn.execute("PRAGMA synchronous=OFF")
+        dbapi_conn.execute("PRAGMA cache_size=-200000")
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def _rewrite(conn, cursor, statement, parameters, context, executemany):
+        statement = statement.replace("information_schema.columns", COLUMNS_SQL).replace(" FOR UPDATE", "")
+        return statement, parameters
+
+    return engine
+
+
+def create_schema(engine):
+    with engine.begin() as conn:
+        for ddl in SQLITE_DDL:
+            conn.execute(text(ddl))
+        for name, cols in INDEXES.items():
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON incidents ({', '.join(cols)})"))
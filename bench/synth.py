@@ -0,0 +1,106 @@
+# bench/synth.py
+# 합성 incidents 데이터 생성기
+#  - 플랫폼 레진/발코니/델리툰(+기타) 가중치, 카테고리는 지프 분포로 쏠림, 한국어 본문
+#  - numpy로 청크 단위 생성 → executemany 적재 (수백만 행)
+# 실행: python bench/synth.py --rows 2000000 --db bench/incidents.db
+
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from importer import DURATION_COL, INCIDENT_COLS, duration_minutes, insert_sql, to_records  # noqa: E402
+from rollup import rebuild_daily  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from standin import create_schema, sqlite_engine  # noqa: E402
+
+PLATFORMS = (["레진", "발코니", "델리툰", "ALL", "웹"], [0.45, 0.25, 0.2, 0.07, 0.03])
+LOCALES = (["KR", "JP", "US", "ALL"], [0.6, 0.25, 0.12, 0.03])
+CATEGORIES = ["결제", "로그인", "뷰어", "이미지", "푸시", "검색", "업데이트", "서버", "CDN", "이벤트", "쿠폰", "기타"]
+WORDS = ["결제", "오류", "로그인", "지연", "서버", "점검", "앱", "업데이트", "이미지", "로딩", "실패", "발생",
+         "사용자", "문의", "증가", "원인", "파악", "중", "조치", "완료", "재배포", "캐시", "장애", "뷰어",
+         "안드로이드", "iOS", "웹", "결제수단", "타임아웃", "DB", "커넥션", "트래픽", "급증", "복구"]
+END = datetime(2026, 1, 1)
+
+
+def text_pool(rng, size: int, lines=(1, 6), words=(6, 28)) -> np.ndarray:
+    out = []
+    for _ in range(size):
+        n = rng.integers(*lines)
+        out.append("\n".join(" ".join(rng.choice(WORDS, rng.integers(*words))) for _ in range(n)))
+    return np.array(out, dtype=object)
+
+
+def generate(rows: int, seed: int = 0, chunk: int = 50_000, years: int = 3):
+    """합성 행을 chunk 단위 DataFrame으로 생성 (started_at은 END 이전 years년 구간)."""
+    rng = np.random.default_rng(seed)
+    pools = {c: text_pool(rng, 3000) for c in ["description", "cause", "response", "note"]}
+    span = int(years * 365 * 86400)
+    zipf = 1.0 / np.arange(1, len(CATEGORIES) + 1) ** 1.2
+    zipf /= zipf.sum()
+    for start in range(0, rows, chunk):
+        n = min(chunk, rows - start)
+        started = pd.to_datetime(END.timestamp() - rng.integers(0, span, n), unit="s").floor("min")
+        dur = rng.gamma(1.5, 40, n).astype(int) + 1
+        has_end = rng.random(n) < 0.7
+        df = pd.DataFrame({
+            "started_at": started,
+            "ended_at": pd.Series(started + pd.to_timedelta(dur, unit="m")).where(has_end),
+            "duration": np.where(dur >= 60, [f"{d // 60}h {d % 60}m" for d in dur], [f"{d}m" for d in dur]),
+            "platform": rng.choice(PLATFORMS[0], n, p=PLATFORMS[1]),
+            "locale": rng.choice(LOCALES[0], n, p=LOCALES[1]),
+            "inquiry_count": rng.poisson(3, n),
+            "category": rng.choice(CATEGORIES, n, p=zipf),
+        })
+        for c, pool in pools.items():
+            df[c] = pool[rng.integers(0, len(pool), n)]
+        df.loc[rng.random(n) < 0.5, "note"] = None
+        yield df[INCIDENT_COLS]
+
+
+def csv_bytes(rows: int, seed: int = 1) -> io.BytesIO:
+    """업로드 벤치마크용 CSV 파일 (메모리)."""
+    buf = io.BytesIO()
+    for i, df in enumerate(generate(rows, seed=seed)):
+        buf.write(df.to_csv(index=False, header=(i == 0)).encode("utf-8"))
+    buf.size = buf.tell()
+    buf.seek(0)
+    return buf
+
+
+def load(engine, rows: int, seed: int = 0, log=print) -> int:
+    create_schema(engine)
+    insert = insert_sql(INCIDENT_COLS + [DURATION_COL])
+    t0 = time.perf_counter()
+    done = 0
+    for df in generate(rows, seed=seed):
+        with engine.begin() as conn:
+            conn.execute(insert, to_records(df.assign(**{DURATION_COL: duration_minutes(df)})))
+        done += len(df)
+        log(f"\r{done:,}/{rows:,} 행 ({time.perf_counter() - t0:.0f}s)", end="")
+    log("")
+    rebuild_daily(engine)
+    log(f"적재+일별 집계 완료: {time.perf_counter() - t0:.1f}s")
+    return done
+
+
+def main():
+    ap = argparse.ArgumentParser(description="합성 incidents 데이터를 SQLite에 적재")
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--db", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "incidents.db"))
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    load(sqlite_engine(args.db), args.rows, args.seed)
+
+
+if __name__ == "__main__":
+    main()
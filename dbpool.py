@@ -0,0 +1,132 @@
+# dbpool.py
+# 커넥션 풀 설정/상태 (streamlit 비의존)
+#  - 풀 크기/overflow/recycle/timeout/LIFO: secrets [db] 섹션(POOL_SIZE ...) 또는 환경변수(DB_POOL_SIZE ...)
+#  - 유휴 기준 ping: 반납 후 PING_IDLE초 이상 놀던 연결만 체크아웃 시 SELECT 1 (매 체크아웃 pre-ping 대신)
+#    ping 실패 시 DisconnectionError → 풀이 그 연결을 버리고 새로 연결
+#  - 카운터: 체크아웃/신규 연결/ping/ping 실패/무효화, 체크아웃 대기시간(connect() 호출 기준)
+
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError
+
+# 설정 키 → (create_engine 인자, 변환, 기본값)
+POOL_KEYS = {
+    "POOL_SIZE":     ("pool_size",     int,   10),
+    "MAX_OVERFLOW":  ("max_overflow",  int,   10),
+    "POOL_RECYCLE":  ("pool_recycle",  int,   1800),   # 초. 서버/프록시 wait_timeout보다 짧게
+    "POOL_TIMEOUT":  ("pool_timeout",  float, 30),
+    "POOL_LIFO":     ("pool_use_lifo", lambda v: str(v).lower() in ("1", "true", "yes", "on"), True),
+}
+DEFAULT_PING_IDLE = 60.0   # 초. 0이면 매 체크아웃 pre-ping(기존 동작), 음수면 ping 없음
+
+COUNTERS: dict = defaultdict(float)
+_lock = threading.Lock()
+
+
+def _setting(cfg, key: str):
+    """cfg(secrets 섹션 등 dict 류)의 KEY/key → 환경변수 DB_KEY 순으로 조회."""
+    if cfg is not None:
+        for k in (key, key.lower()):
+            if cfg.get(k) not in (None, ""):
+                return cfg.get(k)
+    return os.getenv(f"DB_{key}") or None
+
+
+def pool_options(cfg=None) -> dict:
+    """create_engine에 넘길 풀 인자 (pool_pre_ping 포함)."""
+    opts = {}
+    for key, (arg, conv, default) in POOL_KEYS.items():
+        v = _setting(cfg, key)
+        opts[arg] = default if v is None else conv(v)
+    opts["pool_pre_ping"] = ping_idle(cfg) == 0
+    return opts
+
+
+def ping_idle(cfg=None) -> float:
+    v = _setting(cfg, "PING_IDLE")
+    return DEFAULT_PING_IDLE if v is None else float(v)
+
+
+def _count(name: str, n: float = 1):
+    with _lock:
+        COUNTERS[name] += n
+
+
+def instrument_pool(engine, idle: float = DEFAULT_PING_IDLE):
+    """풀 이벤트 카운터 + 유휴 기준 ping 훅 (엔진 생성 시 1회). idle<=0이면 ping 훅 없음."""
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_conn, rec):
+        _count("connects")
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_conn, rec):
+        rec.info["idle_since"] = time.monotonic()
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(dbapi_conn, rec, exc):
+        _count("invalidated")
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_conn, rec, proxy):
+        _count("checkouts")
+        since = rec.info.get("idle_since")
+        if idle <= 0 or since is None or time.monotonic() - since < idle:
+            return
+        _count("pings")
+        try:
+            cur = dbapi_conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+        except Exception as e:
+            _count("ping_failures")
+            raise DisconnectionError(f"유휴 연결 ping 실패: {e}") from e
+
+    return engine
+
+
+def checkout(engine):
+    """engine.connect() + 체크아웃 대기시간 기록. 연결은 호출자가 close."""
+    t0 = time.perf_counter()
+    conn = engine.connect()
+    ms = (time.perf_counter() - t0) * 1000
+    with _lock:
+        COUNTERS["connect_calls"] += 1
+        COUNTERS["wait_ms"] += ms
+        COUNTERS["wait_ms_max"] = max(COUNTERS["wait_ms_max"], ms)
+    return conn
+
+
+@contextmanager
+def connect(engine):
+    conn = checkout(engine)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def pool_stats(engine) -> dict:
+    """현재 풀 상태 + 누적 카운터."""
+    pool = engine.pool
+    stats = {}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, name, None)
+        stats[name] = fn() if callable(fn) else None
+    with _lock:
+        c = dict(COUNTERS)
+    calls = int(c.get("connect_calls", 0))
+    stats.update({
+        "checkouts":     int(c.get("checkouts", 0)),
+        "connects":      int(c.get("connects", 0)),
+        "pings":         int(c.get("pings", 0)),
+        "ping_failures": int(c.get("ping_failures", 0)),
+        "invalidated":   int(c.get("invalidated", 0)),
+        "wait_ms_avg":   round(c.get("wait_ms", 0) / calls, 2) if calls else 0.0,
+        "wait_ms_max":   round(c.get("wait_ms_max", 0), 2),
+    })
+    return stats
@@ -0,0 +1,188 @@
+# deletion.py
+# 일괄 삭제 (streamlit 비의존)
+#  - 대상: ID/ID 범위("101,102,120-130") 또는 필터 조건(where_sql/params, 사이드바와 같은 조건)
+#  - id 오름차순 키셋으로 DELETE_BATCH행씩 짧은 트랜잭션 → 배치 사이 DELETE_PAUSE초 쉬어 다른 세션의 조회/쓰기가 끼어들 수 있게
+#  - soft=True면 deleted_at 표시(UPDATE)만 → 조회는 deleted_at IS NULL 조건으로 건너뜀, restore()로 되돌림
+#    삭제 표시할 때 content_key도 비움 → 같은 내용을 다시 입력/업로드하면 새 행으로 들어감 (복구 시 키 재계산)
+#  - 배치마다 incidents_audit에 작업 id/대상 행 기록 (영구 삭제는 행 전체를 JSON으로 남김)
+#  - on_batch(conn, started_ats): 같은 트랜잭션에서 호출 (일별 집계 갱신 등)
+
+import json
+import os
+import re
+import time
+import uuid
+from typing import Callable
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from importer import KEY_COLS, content_keys, has_content_key
+from queries import sql
+from schema import AUDIT_DDL
+
+DELETE_BATCH = int(os.getenv("DELETE_BATCH") or 500)
+DELETE_PAUSE = float(os.getenv("DELETE_PAUSE") or 0.05)
+MAX_ID_TERMS = 1000   # 입력 한 번에 받는 ID/범위 항목 수
+
+ROW_COLS = ["id", "started_at", "ended_at", "duration", "platform", "locale", "inquiry_count", "category",
+            "description", "cause", "response", "note"]
+
+
+def parse_ids(spec: str) -> tuple[list[int], list[tuple[int, int]]]:
+    """'101, 102, 120-130' → ([101, 102], [(120, 130)]). 잘못된 항목은 ValueError."""
+    ids, ranges = [], []
+    terms = [t.strip() for t in re.split(r"[,\s]+", spec or "") if t.strip()]
+    if len(terms) > MAX_ID_TERMS:
+        raise ValueError(f"항목은 한 번에 {MAX_ID_TERMS}개까지 입력할 수 있습니다 (범위 a-b 사용).")
+    for t in terms:
+        m = re.fullmatch(r"(\d+)\s*[-~]\s*(\d+)", t)
+        if m:
+            lo, hi = sorted((int(m.group(1)), int(m.group(2))))
+            ranges.append((lo, hi))
+        elif t.isdigit():
+            ids.append(int(t))
+        else:
+            raise ValueError(f"ID 형식이 아닙니다: {t}")
+    return sorted(set(ids)), ranges
+
+
+def id_selection(ids: list[int], ranges: list[tuple[int, int]]) -> tuple[str, dict]:
+    """parse_ids 결과 → (WHERE 조각, 파라미터)."""
+    parts, params = [], {}
+    if ids:
+        parts.append("i.id IN :ids")
+        params["ids"] = tuple(ids)
+    for n, (lo, hi) in enumerate(ranges):
+        parts.append(f"i.id BETWEEN :lo{n} AND :hi{n}")
+        params[f"lo{n}"], params[f"hi{n}"] = lo, hi
+    return "(" + " OR ".join(parts or ["1=0"]) + ")", params
+
+
+def count_selection(conn, where_sql: str, params: dict) -> int:
+    stmt = f"SELECT COUNT(*) FROM incidents i WHERE {where_sql}"
+    return int(conn.execute(sql(stmt, params), params).scalar() or 0)
+
+
+def ensure_audit(engine):
+    """감사 테이블이 없으면 생성 (마이그레이션 전 DB)."""
+    with engine.begin() as conn:
+        if not inspect(conn).has_table("incidents_audit"):
+            conn.execute(text(AUDIT_DDL))
+
+
+def _audit(conn, job_id: str, action: str, rows: pd.DataFrame, actor: str | None, reason: str | None,
+           keep_rows: bool):
+    recs = rows.astype(object).where(rows.notna(), None).to_dict("records")
+    conn.execute(text("""
+        INSERT INTO incidents_audit (job_id, action, incident_id, started_at, row_json, actor, reason)
+        VALUES (:job_id, :action, :incident_id, :started_at, :row_json, :actor, :reason)
+    """), [{"job_id": job_id, "action": action, "incident_id": int(r["id"]),
+            "started_at": pd.Timestamp(r["started_at"]).to_pydatetime() if r.get("started_at") is not None else None,
+            "row_json": json.dumps(r, ensure_ascii=False, default=str) if keep_rows else None,
+            "actor": actor, "reason": reason} for r in recs])
+
+
+def _batches(engine, where_sql: str, params: dict, cols: list[str], batch_size: int, pause: float, work,
+             progress: Callable | None, total: int) -> int:
+    """where_sql 대상 행을 id 오름차순 batch_size행씩 읽어 work(conn, rows) 실행 (배치마다 커밋)."""
+    done, last_id = 0, 0
+    stmt = (f"SELECT {', '.join('i.' + c for c in cols)} FROM incidents i "
+            f"WHERE ({where_sql}) AND i.id > :last_id ORDER BY i.id LIMIT :n")
+    while True:
+        with engine.begin() as conn:
+            p = dict(params, last_id=last_id, n=int(batch_size))
+            rows = pd.read_sql(sql(stmt, p), conn, params=p)
+            if rows.empty:
+                break
+            last_id = int(rows["id"].iloc[-1])
+            work(conn, rows)
+        done += len(rows)
+        if progress:
+            progress(done, min(1.0, done / total) if total else None)
+        if len(rows) < batch_size:
+            break
+        time.sleep(pause)
+    return done
+
+
+def bulk_delete(engine, where_sql: str, params: dict, soft: bool = False, actor: str | None = None,
+                reason: str | None = None, batch_size: int = DELETE_BATCH, pause: float = DELETE_PAUSE,
+                on_batch: Callable | None = None, progress: Callable | None = None) -> dict:
+    """where_sql(별칭 i) 대상 행을 배치로 삭제(soft=True면 삭제 표시). 반환: job_id/rows/started_ats.
+    progress(rows_done, fraction)는 배치 커밋 후 호출. 중간에 실패하면 커밋된 배치까지 반영(감사 로그 포함)."""
+    ensure_audit(engine)
+    with engine.connect() as conn:
+        total = count_selection(conn, where_sql, params)
+        keyed = soft and has_content_key(conn)
+    job_id = uuid.uuid4().hex
+    touched = []
+
+    def work(conn, rows):
+        ids = {"ids": tuple(int(x) for x in rows["id"])}
+        if soft:
+            conn.execute(sql("UPDATE incidents SET deleted_at = CURRENT_TIMESTAMP"
+                             f"{', content_key = NULL' if keyed else ''} "
+                             "WHERE id IN :ids AND deleted_at IS NULL", ids), ids)
+        else:
+            conn.execute(sql("DELETE FROM incidents WHERE id IN :ids", ids), ids)
+        _audit(conn, job_id, "soft_delete" if soft else "delete", rows, actor, reason, keep_rows=not soft)
+        started = rows["started_at"].dropna()
+        if on_batch:
+            on_batch(conn, started)
+        touched.extend(started)
+
+    cols = ["id", "started_at"] if soft else ROW_COLS
+    where = where_sql if not soft else f"({where_sql}) AND i.deleted_at IS NULL"
+    n = _batches(engine, where, params, cols, batch_size, pause, work, progress, total)
+    return {"job_id": job_id, "rows": n, "started_ats": touched}
+
+
+def restore(engine, job_id: str, actor: str | None = None, batch_size: int = DELETE_BATCH,
+            pause: float = DELETE_PAUSE, on_batch: Callable | None = None,
+            progress: Callable | None = None) -> dict:
+    """soft delete 작업(job_id)으로 삭제 표시된 행을 되돌림. 반환: job_id(복구 작업)/rows/started_ats/unkeyed.
+    content_key를 다시 계산해 채움. 삭제 후 같은 내용이 새로 등록돼 키가 겹치면 NULL로 두고 unkeyed로 셈."""
+    where = ("i.deleted_at IS NOT NULL AND i.id IN "
+             "(SELECT a.incident_id FROM incidents_audit a WHERE a.job_id = :src AND a.action = 'soft_delete')")
+    params = {"src": job_id}
+    with engine.connect() as conn:
+        total = count_selection(conn, where, params)
+        keyed = has_content_key(conn)
+    new_job = uuid.uuid4().hex
+    touched, unkeyed = [], [0]
+
+    def work(conn, rows):
+        ids = {"ids": tuple(int(x) for x in rows["id"])}
+        conn.execute(sql("UPDATE incidents SET deleted_at = NULL WHERE id IN :ids", ids), ids)
+        if keyed:
+            keys = content_keys(rows)
+            p = {"keys": tuple(keys.unique())}
+            taken = set(conn.execute(sql("SELECT content_key FROM incidents WHERE content_key IN :keys", p),
+                                     p).scalars())
+            dup = keys.isin(taken) | keys.duplicated()
+            todo = [{"id": int(i), "k": k} for i, k in zip(rows["id"][~dup], keys[~dup])]
+            if todo:
+                conn.execute(text("UPDATE incidents SET content_key = :k WHERE id = :id"), todo)
+            unkeyed[0] += int(dup.sum())
+        _audit(conn, new_job, "restore", rows[["id", "started_at"]], actor, f"restore {job_id}", keep_rows=False)
+        started = rows["started_at"].dropna()
+        if on_batch:
+            on_batch(conn, started)
+        touched.extend(started)
+
+    cols = ["id"] + KEY_COLS if keyed else ["id", "started_at"]
+    n = _batches(engine, where, params, cols, batch_size, pause, work, progress, total)
+    return {"job_id": new_job, "rows": n, "started_ats": touched, "unkeyed": unkeyed[0]}
+
+
+def recent_jobs(conn, limit: int = 20) -> pd.DataFrame:
+    """최근 삭제/복구 작업: job_id, action, 건수, 실행자, 사유, 시각."""
+    return pd.read_sql(text("""
+        SELECT job_id, action, COUNT(*) AS cnt, MAX(actor) AS actor, MAX(reason) AS reason,
+               MIN(created_at) AS created_at
+        FROM incidents_audit
+        GROUP BY job_id, action
+        ORDER BY MIN(created_at) DESC
+        LIMIT :n
+    """), conn, params={"n": int(limit)})
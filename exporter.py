@@ -0,0 +1,185 @@
+# exporter.py
+# 필터 결과 내보내기 (CSV/엑셀, streamlit 비의존)
+#  - 서버 측 커서(stream_results + yield_per)로 EXPORT_CHUNK행씩 받아 바로 파일에 씀 → 결과 전체를 메모리에 올리지 않음
+#  - CSV: utf-8-sig(엑셀 호환), 청크마다 to_csv / XLSX: openpyxl write_only(행 단위 스트리밍), 시트당 행 한도 넘으면 다음 시트
+#  - 컬럼은 업로드 형식(importer.INCIDENT_COLS) + id → 내보낸 파일을 그대로 다시 업로드 가능
+#  - 화면 내보내기 파일(ExportFile)은 EXPORT_DIR에 만들고, 새 파일을 만들거나 세션이 끝나 객체가 정리되면 삭제
+#    (프로세스가 죽어 남은 파일은 다음 내보내기 때 EXPORT_MAX_AGE초 지난 것부터 정리)
+# 실행: python exporter.py --from 2025-01-01 --to 2025-01-31 [--platform 레진 ...] [--keyword 결제] [--format xlsx] [--out 파일]
+#       (--out 생략 시 CSV를 표준출력으로 바로 흘려보냄. DB_HOST/DB_PORT/DB_USER/DB_PASSWORD/DB_NAME)
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import weakref
+from datetime import datetime
+from typing import Callable, Iterator
+
+import pandas as pd
+
+from importer import INCIDENT_COLS
+from queries import build_filters, has_soft_delete, keyword_clause, sql, where_sqls
+
+EXPORT_COLS = ["id"] + INCIDENT_COLS
+EXPORT_CHUNK = int(os.getenv("EXPORT_CHUNK") or 5000)
+EXPORT_FORMATS = ("csv", "xlsx")
+XLSX_MAX_ROWS = 1_048_575   # 시트당 데이터 행 (헤더 제외)
+EXPORT_DIR = os.getenv("EXPORT_DIR") or os.path.join(tempfile.gettempdir(), "incidents_exports")
+EXPORT_MAX_AGE = int(os.getenv("EXPORT_MAX_AGE") or 6 * 3600)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def sweep_exports(max_age: float = EXPORT_MAX_AGE) -> int:
+    """EXPORT_DIR에서 max_age초보다 오래된 파일 삭제 (정리 못 하고 남은 파일). 삭제한 수 반환."""
+    if not os.path.isdir(EXPORT_DIR):
+        return 0
+    n, cutoff = 0, time.time() - max_age
+    for entry in os.scandir(EXPORT_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                n += 1
+        except OSError:
+            pass   # 다른 프로세스가 먼저 지움
+    return n
+
+
+class ExportFile:
+    """내보내기 임시 파일 하나. remove()로 바로, 또는 객체가 정리될 때(세션 종료로 session_state가 사라질 때,
+    프로세스 종료 시) 파일 삭제."""
+
+    def __init__(self, fmt: str, sig=None):
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        sweep_exports()
+        fd, self.path = tempfile.mkstemp(dir=EXPORT_DIR, prefix="incidents_", suffix=f".{fmt}")
+        os.close(fd)
+        self.fmt, self.sig, self.rows = fmt, sig, 0
+        self._cleanup = weakref.finalize(self, _remove, self.path)
+
+    def remove(self):
+        self._cleanup()
+
+    def exists(self) -> bool:
+        return self._cleanup.alive and os.path.exists(self.path)
+
+
+def export_sql(where_sql: str) -> str:
+    return f"""
+        SELECT {", ".join("i." + c for c in EXPORT_COLS)}
+        FROM incidents i
+        WHERE {where_sql}
+        ORDER BY i.started_at DESC, i.id DESC
+    """
+
+
+def iter_rows(conn, where_sql: str, params: dict, chunk: int = EXPORT_CHUNK) -> Iterator[pd.DataFrame]:
+    """where_sql/params 조건의 전체 행을 chunk행 DataFrame으로 순회 (서버 측 커서).
+    스트리밍 중에는 연결을 점유하므로 공유 연결이 아닌 전용 연결을 넘길 것."""
+    result = conn.execution_options(stream_results=True, yield_per=chunk).execute(
+        sql(export_sql(where_sql), params), params)
+    cols = list(result.keys())
+    for rows in result.partitions(chunk):
+        yield pd.DataFrame(rows, columns=cols)
+
+
+def write_csv(chunks, out, progress: Callable | None = None) -> int:
+    """청크를 CSV로 이어 씀. out은 바이너리 파일 객체. 쓴 행 수 반환."""
+    text_out = io.TextIOWrapper(out, encoding="utf-8-sig", newline="", write_through=True)
+    n = 0
+    try:
+        for df in chunks:
+            df.to_csv(text_out, header=(n == 0), index=False, date_format="%Y-%m-%d %H:%M:%S")
+            n += len(df)
+            if progress:
+                progress(n)
+        if n == 0:
+            pd.DataFrame(columns=EXPORT_COLS).to_csv(text_out, index=False)
+    finally:
+        text_out.detach()   # out은 호출자가 닫음
+    return n
+
+
+def write_xlsx(chunks, out, progress: Callable | None = None) -> int:
+    """청크를 write_only 워크북에 행 단위로 추가 후 out(경로 또는 바이너리 파일 객체)에 저장. 쓴 행 수 반환."""
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    wb = Workbook(write_only=True)
+    ws, in_sheet, n = None, XLSX_MAX_ROWS, 0
+    for df in chunks:
+        # pandas 3은 문자열을 StringDtype으로 읽으므로 object만 보면 제어문자 제거가 빠짐
+        text_cols = [c for c in df.columns
+                     if pd.api.types.is_string_dtype(df[c]) or pd.api.types.is_object_dtype(df[c])]
+        df[text_cols] = df[text_cols].apply(lambda s: s.str.replace(ILLEGAL_CHARACTERS_RE, "", regex=True))
+        for row in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+            if in_sheet >= XLSX_MAX_ROWS:
+                ws = wb.create_sheet(f"incidents{'' if ws is None else len(wb.worksheets)}")
+                ws.append(EXPORT_COLS)
+                in_sheet = 0
+            ws.append(row)
+            in_sheet += 1
+        n += len(df)
+        if progress:
+            progress(n)
+    if ws is None:
+        wb.create_sheet("incidents").append(EXPORT_COLS)
+    wb.save(out)
+    return n
+
+
+def export(conn, where_sql: str, params: dict, fmt: str, out, progress: Callable | None = None,
+           chunk: int = EXPORT_CHUNK) -> int:
+    """필터 결과를 fmt(csv/xlsx)로 out에 씀. 쓴 행 수 반환."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"알 수 없는 형식: {fmt}")
+    chunks = iter_rows(conn, where_sql, params, chunk)
+    return (write_csv if fmt == "csv" else write_xlsx)(chunks, out, progress)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="incidents 필터 결과 내보내기 (스트리밍)")
+    ap.add_argument("--from", dest="date_from", required=True, help="시작일 YYYY-MM-DD")
+    ap.add_argument("--to", dest="date_to", required=True, help="종료일 YYYY-MM-DD (포함)")
+    ap.add_argument("--platform", action="append", default=[])
+    ap.add_argument("--locale", action="append", default=[])
+    ap.add_argument("--category", action="append", default=[])
+    ap.add_argument("--keyword", default="")
+    ap.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    ap.add_argument("--out", help="출력 파일 (생략 시 CSV 표준출력)")
+    args = ap.parse_args()
+    if args.format == "xlsx" and not args.out:
+        raise SystemExit("xlsx는 --out 파일이 필요합니다.")
+
+    from schema import engine_from_env, fulltext_token_size
+    engine = engine_from_env()
+    with engine.connect() as conn:
+        kw = keyword_clause(args.keyword, fulltext_token_size(conn))
+        params, filters = build_filters(
+            datetime.fromisoformat(args.date_from),
+            datetime.combine(datetime.fromisoformat(args.date_to).date(), datetime.max.time()),
+            args.platform, args.locale, args.category, kw)
+        _, where_sql = where_sqls(filters, has_soft_delete(conn))
+
+        def _progress(n):
+            print(f"\r{n:,}행", end="", file=sys.stderr)
+
+        if args.out:
+            with open(args.out, "wb") as f:
+                n = export(conn, where_sql, params, args.format, f, _progress)
+        else:
+            n = export(conn, where_sql, params, "csv", sys.stdout.buffer, _progress)
+            sys.stdout.flush()
+    print(f"\r내보내기 완료: {n:,}행", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+# importer.py
+# CSV/엑셀 업로드 스트리밍 적재 (streamlit 비의존)
+#  - CSV: pd.read_csv(chunksize) / xlsx: openpyxl read-only 행 순회 / xls: pd.read_excel 후 분할
+#  - 청크 단위 정규화(벡터화) → 배치 INSERT(executemany, pymysql이 다중 VALUES로 묶음) → 배치마다 커밋
+#  - 커밋된 행 수(offset)를 반환하므로 실패 시 start_offset으로 이어서 적재 가능
+#  - 중복제거: content_key(시작시각/플랫폼/로케일/카테고리/정규화된 내용의 SHA1) UNIQUE 인덱스 +
+#    임시 staging 테이블에서 집합 단위 병합 (skip: 신규만 추가 / upsert: 기존 행 갱신)
+#  - 장애시간(분): duration 자유 입력("2h 30m", "45분", "1:30" ...)을 파싱, 없으면 ended_at - started_at →
+#    duration_minutes 컬럼 (컬럼이 있을 때만 함께 적재, 기존 행은 migrate_duration으로 백필)
+
+import hashlib
+import os
+import re
+from typing import Callable, Iterator
+
+import pandas as pd
+from sqlalchemy import text
+
+from queries import has_soft_delete
+
+INCIDENT_COLS = ["started_at", "ended_at", "duration", "platform", "locale", "inquiry_count",
+                 "category", "description", "cause", "response", "note"]
+REQUIRED_COLS = ["started_at", "category", "description"]
+KEY_COLS = ["started_at", "platform", "locale", "category", "description"]
+UPDATE_COLS = ["ended_at", "duration", "inquiry_count", "description", "cause", "response", "note"]
+KEY_INDEX = "uq_incidents_content_key"
+DURATION_COL = "duration_minutes"
+DEFAULT_BATCH_SIZE = int(os.getenv("UPLOAD_BATCH_SIZE") or 1000)
+IMPORT_MODES = ("append", "skip", "upsert")   # append: 중복 검사 없음(content_key 마이그레이션 전)
+
+
+
+def insert_sql(cols: list[str]):
+    return text(f"INSERT INTO incidents ({', '.join(cols)}) VALUES ({', '.join(':' + c for c in cols)})")
+
+
+INSERT_SQL = insert_sql(INCIDENT_COLS)
+
+
+def normalize_df(df: pd.DataFrame, duration: bool = False) -> pd.DataFrame:
+    """업로드 청크 → INCIDENT_COLS (+ duration=True면 duration_minutes) 순서의 DataFrame."""
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    missing = [c for c in REQUIRED_COLS if c not in df.columns]
+    if missing:
+        raise ValueError(f"필수 컬럼 누락: {missing}")
+    for dt in ["started_at", "ended_at"]:
+        if dt in df.columns:
+            df[dt] = pd.to_datetime(df[dt], errors="coerce")
+    if "inquiry_count" in df.columns:
+        df["inquiry_count"] = pd.to_numeric(df["inquiry_count"], errors="coerce")
+    for col in INCIDENT_COLS:
+        if col not in df.columns:
+            df[col] = None
+    if duration:
+        df[DURATION_COL] = duration_minutes(df)
+        return df[INCIDENT_COLS + [DURATION_COL]]
+    return df[INCIDENT_COLS]
+
+
+def iter_chunks(file, name: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """파일을 chunk_size행 단위 DataFrame으로 순회 (헤더 행 기준 컬럼명)."""
+    lower = name.lower()
+    if lower.endswith(".csv"):
+        yield from pd.read_csv(file, chunksize=chunk_size)
+    elif lower.endswith(".xlsx"):
+        from openpyxl import load_workbook
+        wb = load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            buf = []
+            for row in rows:
+                if any(v is not None for v in row):
+                    buf.append(row)
+                if len(buf) >= chunk_size:
+                    yield pd.DataFrame(buf, columns=header)
+                    buf = []
+            if buf:
+                yield pd.DataFrame(buf, columns=header)
+        finally:
+            wb.close()
+    else:   # .xls: 행 단위 읽기 미지원 → 한 번에 읽고 분할
+        df = pd.read_excel(file)
+        for i in range(0, len(df), chunk_size):
+            yield df.iloc[i:i + chunk_size]
+
+
+def file_fingerprint(file, size: int | None = None, chunk: int = 1 << 16) -> str:
+    """이어서 적재할 때 같은 파일인지 확인하는 키: 크기 + 앞/뒤 chunk바이트의 SHA1 (읽은 뒤 처음으로 되감음).
+    이름/크기만 같은 다른 파일을 이어 적재해 앞쪽 행을 건너뛰지 않게."""
+    size = getattr(file, "size", None) if size is None else size
+    h = hashlib.sha1(str(size).encode())
+    file.seek(0)
+    h.update(file.read(chunk))
+    if size and size > chunk:
+        file.seek(max(chunk, size - chunk))
+        h.update(file.read(chunk))
+    file.seek(0)
+    return h.hexdigest()
+
+
+def to_records(df: pd.DataFrame) -> list[dict]:
+    """NaN/NaT → None, Timestamp → datetime 으로 바꾼 executemany용 레코드."""
+    recs = df.astype(object).where(df.notna(), None).to_dict("records")
+    return [{k: v.to_pydatetime() if isinstance(v, pd.Timestamp) else v for k, v in r.items()} for r in recs]
+
+
+def insert_batch(conn, df: pd.DataFrame) -> int:
+    if df.empty:
+        return 0
+    conn.execute(INSERT_SQL if list(df.columns) == INCIDENT_COLS else insert_sql(list(df.columns)),
+                 to_records(df))
+    return len(df)
+
+
+# ---------------------------
+# 장애시간(분) (duration_minutes)
+# ---------------------------
+# 단위 → (정규식, 분 환산). 긴 표기를 먼저 (min이 m보다 먼저 매칭되도록)
+DURATION_UNITS = [
+    (r"(?:days?|d|일)",                       24 * 60),
+    (r"(?:hours?|hrs?|h|시간)",               60),
+    (r"(?:minutes?|mins?|m(?![a-z])|분)",     1),
+    (r"(?:seconds?|secs?|s(?![a-z])|초)",     1 / 60),
+]
+_NUM = r"(\d+(?:\.\d+)?)\s*"
+_CLOCK_RE = r"^(\d{1,3}):(\d{2})(?::(\d{2}))?$"       # h:mm[:ss]
+_PLAIN_RE = r"^\d+(?:\.\d+)?$"                          # 단위 없는 숫자 = 분
+
+
+def parse_duration(s: pd.Series) -> pd.Series:
+    """자유 입력 장애시간 → 분(float, 못 읽으면 NaN). 벡터화 (행 단위 파이썬 루프 없음).
+    "2h 30m", "1시간 20분", "90분", "1d 2h", "1:30", "01:30:00", "45" 등. "/" 뒤(병기)는 무시."""
+    text_ = s.astype("string").str.lower().str.split("/", n=1).str[0].str.strip()
+    total = pd.Series(0.0, index=s.index)
+    found = pd.Series(False, index=s.index)
+    for unit, minutes in DURATION_UNITS:
+        v = pd.to_numeric(text_.str.extract(_NUM + unit, flags=re.IGNORECASE)[0], errors="coerce")
+        total += v.fillna(0) * minutes
+        found |= v.notna()
+    clock = text_.str.extract(_CLOCK_RE).apply(pd.to_numeric, errors="coerce")
+    is_clock = clock[0].notna() & ~found
+    total[is_clock] = (clock[0] * 60 + clock[1] + clock[2].fillna(0) / 60)[is_clock]
+    plain = text_.str.fullmatch(_PLAIN_RE).fillna(False).astype(bool) & ~found
+    total[plain] = pd.to_numeric(text_[plain], errors="coerce")
+    return total.where(found | is_clock | plain)
+
+
+def duration_minutes(df: pd.DataFrame) -> pd.Series:
+    """행별 장애시간(분, Int64): duration 파싱 → 없으면 ended_at - started_at. 음수/불명은 NA."""
+    minutes = parse_duration(df["duration"]) if "duration" in df.columns else pd.Series(float("nan"), index=df.index)
+    if "ended_at" in df.columns:
+        span = (pd.to_datetime(df["ended_at"], errors="coerce")
+                - pd.to_datetime(df["started_at"], errors="coerce")).dt.total_seconds() / 60
+        minutes = minutes.fillna(span)
+    return minutes.where(minutes >= 0).round().astype("Int64")
+
+
+def has_duration_minutes(conn) -> bool:
+    n = conn.execute(text("""
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'incidents' AND column_name = :col
+    """), {"col": DURATION_COL}).scalar()
+    return bool(n)
+
+
+def migrate_duration(engine, batch_size: int = 5000, progress: Callable | None = None) -> dict:
+    """마이그레이션: duration_minutes 컬럼 추가 후 기존 행을 id 순으로 백필 (배치마다 커밋).
+    duration/ended_at이 모두 없거나 읽을 수 없는 행은 NULL로 남기고 건수를 돌려준다. 중단되면 다시 실행해 이어서 진행."""
+    with engine.begin() as conn:
+        if not has_duration_minutes(conn):
+            conn.execute(text(f"ALTER TABLE incidents ADD COLUMN {DURATION_COL} INT NULL"))
+        total = conn.execute(text(f"SELECT COUNT(*) FROM incidents WHERE {DURATION_COL} IS NULL")).scalar()
+
+    stats = {"filled": 0, "unparsed": 0}
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            df = pd.read_sql(text(f"""
+                SELECT id, started_at, ended_at, duration FROM incidents
+                WHERE {DURATION_COL} IS NULL AND id > :last_id
+                ORDER BY id LIMIT :n
+            """), conn, params={"last_id": last_id, "n": batch_size})
+            if df.empty:
+                break
+            last_id = int(df["id"].iloc[-1])
+            df[DURATION_COL] = duration_minutes(df)
+            todo = df.loc[df[DURATION_COL].notna(), ["id", DURATION_COL]].astype("int64")
+            if not todo.empty:
+                conn.execute(text(f"UPDATE incidents SET {DURATION_COL} = :{DURATION_COL} WHERE id = :id"),
+                             todo.to_dict("records"))
+            stats["filled"] += len(todo)
+            stats["unparsed"] += len(df) - len(todo)
+        if progress:
+            progress((stats["filled"] + stats["unparsed"]) / max(total, 1))
+    return stats
+
+
+# ---------------------------
+# 중복제거 키 (content_key)
+# ---------------------------
+def content_keys(df: pd.DataFrame) -> pd.Series:
+    """행별 내용 키: started_at(초 단위)/platform/locale/category/description(공백·줄바꿈 정규화)의 SHA1."""
+    started = pd.to_datetime(df["started_at"], errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S").fillna("")
+    dims = [df[c].fillna("").astype(str).str.strip() for c in ["platform", "locale", "category"]]
+    desc = df["description"].fillna("").astype(str).str.replace(r"\s+", " ", regex=True).str.strip()
+    joined = started.str.cat(dims + [desc], sep="\x1f")
+    return pd.Series([hashlib.sha1(v.encode("utf-8")).hexdigest() for v in joined], index=df.index)
+
+
+def has_content_key(conn) -> bool:
+    """content_key 컬럼과 UNIQUE 인덱스가 모두 있으면 True (중복제거 모드 사용 가능)."""
+    n = conn.execute(text("""
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = 'incidents' AND index_name = :name
+    """), {"name": KEY_INDEX}).scalar()
+    return bool(n)
+
+
+def migrate_content_key(engine, batch_size: int = 5000, progress: Callable | None = None) -> dict:
+    """마이그레이션: content_key 컬럼/UNIQUE 인덱스 추가 후 기존 행을 id 순으로 백필.
+    이미 같은 키가 있는 행(기존 중복)은 NULL로 남기고 건수를 돌려준다. 중단되면 다시 실행해 이어서 진행.
+    삭제 표시(deleted_at)된 행은 키를 비워 둔다 (같은 내용을 다시 등록할 수 있게, 복구 시 재계산)."""
+    with engine.begin() as conn:
+        has_col = conn.execute(text("""
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = 'incidents' AND column_name = 'content_key'
+        """)).scalar()
+        if not has_col:
+            conn.execute(text("ALTER TABLE incidents ADD COLUMN content_key CHAR(40) NULL"))
+        if not has_content_key(conn):
+            conn.execute(text(f"ALTER TABLE incidents ADD UNIQUE INDEX {KEY_INDEX} (content_key)"))
+        live = has_soft_delete(conn)
+        if live:
+            conn.execute(text("UPDATE incidents SET content_key = NULL "
+                              "WHERE deleted_at IS NOT NULL AND content_key IS NOT NULL"))
+        total = conn.execute(text("SELECT COUNT(*) FROM incidents WHERE content_key IS NULL"
+                                  + (" AND deleted_at IS NULL" if live else ""))).scalar()
+
+    stats = {"keyed": 0, "duplicates": 0}
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            df = pd.read_sql(text(f"""
+                SELECT id, {", ".join(KEY_COLS)} FROM incidents
+                WHERE content_key IS NULL AND id > :last_id{" AND deleted_at IS NULL" if live else ""}
+                ORDER BY id LIMIT :n
+            """), conn, params={"last_id": last_id, "n": batch_size})
+            if df.empty:
+                break
+            last_id = int(df["id"].iloc[-1])
+            df["content_key"] = content_keys(df)
+            taken = set(conn.execute(text("SELECT content_key FROM incidents WHERE content_key IN :keys"),
+                                     {"keys": tuple(df["content_key"].unique())}).scalars())
+            dup = df["content_key"].isin(taken) | df["content_key"].duplicated()
+            todo = df.loc[~dup, ["id", "content_key"]]
+            if not todo.empty:
+                conn.execute(text("UPDATE incidents SET content_key = :content_key WHERE id = :id"),
+                             todo.to_dict("records"))
+            stats["keyed"] += len(todo)
+            stats["duplicates"] += int(dup.sum())
+        if progress:
+            progress((stats["keyed"] + stats["duplicates"]) / max(total, 1))
+    return stats
+
+
+STAGE_COLS = INCIDENT_COLS + ["content_key"]
+
+
+def create_stage(conn, duration: bool = False):
+    """연결 단위 임시 staging 테이블 (incidents와 같은 컬럼 타입, content_key PK)."""
+    cols = STAGE_COLS + ([DURATION_COL] if duration else [])
+    conn.execute(text("DROP TEMPORARY TABLE IF EXISTS incidents_stage"))
+    conn.execute(text(f"CREATE TEMPORARY TABLE incidents_stage AS SELECT {', '.join(cols)} FROM incidents LIMIT 0"))
+    conn.execute(text("ALTER TABLE incidents_stage ADD PRIMARY KEY (content_key)"))
+
+
+def merge_batch(conn, df: pd.DataFrame, mode: str) -> dict:
+    """배치를 staging에 적재 후 incidents로 집합 병합. 반환: inserted/updated/skipped 건수."""
+    df = df.assign(content_key=content_keys(df))
+    dup_in_batch = df["content_key"].duplicated()
+    df = df[~dup_in_batch]
+    stage_cols = list(df.columns)   # STAGE_COLS (+ duration_minutes)
+    update_cols = UPDATE_COLS + [c for c in stage_cols if c == DURATION_COL]   # 파생 컬럼은 변경 판정에서 제외
+    conn.execute(text("DELETE FROM incidents_stage"))
+    conn.execute(text(f"INSERT INTO incidents_stage ({', '.join(stage_cols)}) "
+                      f"VALUES ({', '.join(':' + c for c in stage_cols)})"), to_records(df))
+    existing = conn.execute(text("""
+        SELECT COUNT(*) FROM incidents_stage s JOIN incidents i ON i.content_key = s.content_key
+    """)).scalar()
+    cols = ", ".join(stage_cols)
+    if mode == "upsert":
+        changed = conn.execute(text(f"""
+            SELECT COUNT(*) FROM incidents_stage s JOIN incidents i ON i.content_key = s.content_key
+            WHERE NOT ({" AND ".join(f"i.{c} <=> s.{c}" for c in UPDATE_COLS)})
+        """)).scalar()
+        # VALUES(col)는 MySQL 8.0.20부터 deprecated → SELECT 쪽 파생 테이블 컬럼(s.col)을 참조
+        conn.execute(text(f"""
+            INSERT INTO incidents ({cols})
+            SELECT * FROM (SELECT {cols} FROM incidents_stage) AS s
+            ON DUPLICATE KEY UPDATE {", ".join(f"{c} = s.{c}" for c in update_cols)}
+        """))
+    else:
+        changed = 0
+        conn.execute(text(f"""
+            INSERT INTO incidents ({cols})
+            SELECT {cols} FROM incidents_stage s
+            WHERE NOT EXISTS (SELECT 1 FROM incidents i WHERE i.content_key = s.content_key)
+        """))
+    return {"inserted": len(df) - existing, "updated": changed,
+            "skipped": existing - changed + int(dup_in_batch.sum())}
+
+
+def stream_import(engine, file, name: str, batch_size: int = DEFAULT_BATCH_SIZE, start_offset: int = 0,
+                  on_batch: Callable | None = None, progress: Callable | None = None,
+                  mode: str = "append") -> dict:
+    """파일을 batch_size행씩 정규화/적재 하고 배치마다 커밋.
+    반환: rows(커밋된 총 행 수 = 다음 start_offset), inserted/updated/skipped 건수.
+
+    mode: append(그대로 INSERT) / skip(같은 content_key가 있으면 건너뜀) / upsert(있으면 갱신)
+    on_batch(conn, batch_df): 같은 트랜잭션 안에서 호출 (집계 갱신 등)
+    progress(rows_done, fraction): 배치 커밋 후 호출. fraction은 파일 위치 기준 추정치(모르면 None)
+    start_offset: 이미 커밋된 데이터 행 수. 그만큼 건너뛰고 이어서 적재
+    duration_minutes 컬럼이 있으면 배치마다 계산해 함께 적재
+    """
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"알 수 없는 업로드 모드: {mode}")
+    size = getattr(file, "size", None) if name.lower().endswith(".csv") else None   # 엑셀은 위치 추정 불가
+    stats = {"rows": start_offset, "inserted": 0, "updated": 0, "skipped": 0}
+    done = 0
+    with engine.connect() as conn:   # 임시 staging 테이블은 연결 단위이므로 한 연결로 진행
+        with conn.begin():
+            duration = has_duration_minutes(conn)
+            if mode != "append":
+                create_stage(conn, duration)
+        for chunk in iter_chunks(file, name, batch_size):
+            n = len(chunk)
+            if done + n <= start_offset:
+                done += n
+                continue
+            if done < start_offset:
+                chunk = chunk.iloc[start_offset - done:]
+                done = start_offset
+            batch = normalize_df(chunk.reset_index(drop=True), duration)
+            with conn.begin():
+                if mode == "append":
+                    res = {"inserted": insert_batch(conn, batch)}
+                else:
+                    res = merge_batch(conn, batch, mode)
+                if on_batch:
+                    on_batch(conn, batch)
+            done += len(batch)
+            stats["rows"] = done
+            for k, v in res.items():
+                stats[k] += v
+            if progress:
+                frac = None
+                if size and hasattr(file, "tell"):
+                    try:
+                        frac = min(1.0, file.tell() / size)
+                    except (OSError, ValueError):
+                        pass
+                progress(done, frac)
+    return stats
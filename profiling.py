@@ -0,0 +1,161 @@
+# profiling.py
+# 쿼리/캐시/화면 구간 계측 (streamlit 비의존)
+#  - SQLAlchemy before/after_cursor_execute 훅: SQL별 지연시간, 반환 행수 (실패한 SQL은 handle_error 훅에서 error와 함께 기록)
+#  - profiled(): 캐시 함수 래퍼. 호출 시간, 결과 크기(bytes), hit/miss (호출 중 SQL이 나갔으면 miss)
+#  - lap(): 직전 lap 이후 경과 시간을 화면 구간 시간으로 기록 (rerun마다 start_run으로 초기화)
+#  - end_run(): 실행 전체 시간 (프로세스 첫 실행 'cold'는 import 포함, 이후 'rerun', fragment 단독 실행은 이름 지정)
+#  - 기록은 프로세스 단위 링버퍼(RECORDS), to_jsonl()로 JSON lines 내보내기
+
+import functools
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import event
+
+MAX_RECORDS = 5000
+RECORD_COLS = ["ts", "run", "kind", "name", "ms", "rows", "bytes", "hit", "sql", "error"]
+RECORDS: deque = deque(maxlen=MAX_RECORDS)
+_local = threading.local()
+_first_run = threading.Event()   # 프로세스 첫 전체 실행이 끝나면 set
+
+
+def _record(kind: str, name: str, ms: float, **extra):
+    RECORDS.append({"ts": datetime.now().isoformat(timespec="milliseconds"), "run": current_run(),
+                    "kind": kind, "name": name, "ms": round(ms, 2), **extra})
+
+
+def current_run() -> str | None:
+    return getattr(_local, "run", None)
+
+
+def start_run(run_id: str | None = None, started: float | None = None) -> str:
+    """스크립트 rerun 시작. 이후 기록에 run id가 붙는다. started: 실제 시작 시각(perf_counter, import 전)."""
+    _local.run = run_id or uuid.uuid4().hex[:8]
+    _local.lap = _local.start = started or time.perf_counter()
+    return _local.run
+
+
+def end_run(name: str | None = None) -> float:
+    """start_run 이후 전체 시간(ms)을 kind='run'으로 기록. name 생략 시 프로세스 첫 실행은 'cold', 이후 'rerun'."""
+    ms = (time.perf_counter() - getattr(_local, "start", time.perf_counter())) * 1000
+    if name is None:
+        name = "rerun" if _first_run.is_set() else "cold"
+        _first_run.set()
+    _record("run", name, ms)
+    return ms
+
+
+def use_run(run_id: str | None):
+    """다른 스레드(동시 실행 쿼리)의 기록에도 같은 run id를 붙인다. lap 기준 시각은 건드리지 않음."""
+    _local.run = run_id
+
+
+def lap(name: str):
+    """직전 lap(또는 start_run) 이후 경과 시간을 구간 name으로 기록."""
+    now = time.perf_counter()
+    _record("section", name, (now - getattr(_local, "lap", now)) * 1000)
+    _local.lap = now
+
+
+def instrument_engine(engine):
+    """엔진에 SQL 실행 시간 훅을 단다 (엔진 생성 시 1회)."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("prof_start", []).append(time.perf_counter())
+        _local.queries = getattr(_local, "queries", 0) + 1
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        t0 = conn.info["prof_start"].pop()
+        label = getattr(_local, "call", None) or " ".join(statement.split())[:60]
+        _record("query", label, (time.perf_counter() - t0) * 1000,
+                rows=cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None,
+                sql=" ".join(statement.split())[:200])
+
+    @event.listens_for(engine, "handle_error")
+    def _error(ctx):
+        # 실패한 SQL은 after_cursor_execute가 안 불림 → 여기서 시작 시각을 꺼내야 풀링된 연결에 쌓이지 않음
+        starts = ctx.connection.info.get("prof_start") if ctx.connection is not None else None
+        if not starts or ctx.statement is None:
+            return
+        t0 = starts.pop()
+        label = getattr(_local, "call", None) or " ".join(ctx.statement.split())[:60]
+        _record("query", label, (time.perf_counter() - t0) * 1000,
+                sql=" ".join(ctx.statement.split())[:200], error=str(ctx.original_exception)[:200])
+
+    return engine
+
+
+def result_bytes(obj) -> int:
+    """캐시 함수 결과의 메모리 크기 추정 (DataFrame은 deep)."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (tuple, list)):
+        return sum(result_bytes(o) for o in obj)
+    if isinstance(obj, dict):
+        return sum(result_bytes(v) for v in obj.values()) + len(json.dumps(obj, default=str).encode())
+    return len(str(obj).encode())
+
+
+def profiled(fn):
+    """캐시 함수 바깥에 씌우는 래퍼: 호출 시간 + hit/miss + (miss일 때) 결과 크기 기록.
+    fn.clear 등 캐시 함수 속성은 그대로 노출."""
+    name = getattr(fn, "__name__", str(fn))
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        before = getattr(_local, "queries", 0)
+        outer = getattr(_local, "call", None)
+        _local.call = name
+        t0 = time.perf_counter()
+        try:
+            res = fn(*args, **kwargs)
+        finally:
+            _local.call = outer
+        ms = (time.perf_counter() - t0) * 1000
+        hit = getattr(_local, "queries", 0) == before
+        _record("cache", name, ms, hit=hit, bytes=None if hit else result_bytes(res))
+        return res
+
+    for attr in ("clear",):
+        if hasattr(fn, attr):
+            setattr(wrapper, attr, getattr(fn, attr))
+    return wrapper
+
+
+def records(run: str | None = None) -> pd.DataFrame:
+    df = pd.DataFrame(list(RECORDS), columns=RECORD_COLS)
+    if run is not None:
+        df = df[df["run"] == run]
+    return df
+
+
+def summarize(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """기록 → 화면 구간 / 쿼리 / 캐시 / 실행 시간 요약 표."""
+    sections = df[df["kind"] == "section"][["name", "ms"]].reset_index(drop=True)
+    q = df[df["kind"] == "query"]
+    queries = (q.groupby("name").agg(calls=("ms", "size"), total_ms=("ms", "sum"), p50_ms=("ms", "median"),
+                                     max_ms=("ms", "max"), rows=("rows", "sum"), errors=("error", "count"))
+               .sort_values("total_ms", ascending=False).reset_index())
+    c = df[df["kind"] == "cache"]
+    cache = (c.assign(hit=c["hit"].astype(bool))
+             .groupby("name").agg(calls=("ms", "size"), hits=("hit", "sum"), total_ms=("ms", "sum"),
+                                  bytes=("bytes", "max"))
+             .reset_index())
+    cache["hit_ratio"] = (cache["hits"] / cache["calls"]).round(2)
+    r = df[df["kind"] == "run"]
+    runs = (r.groupby("name", sort=False).agg(calls=("ms", "size"), p50_ms=("ms", "median"),
+                                              p90_ms=("ms", lambda s: s.quantile(0.9)), max_ms=("ms", "max"),
+                                              last_ms=("ms", "last"))
+            .round(1).reset_index())
+    return {"sections": sections, "queries": queries, "cache": cache, "runs": runs}
+
+
+def to_jsonl(df: pd.DataFrame) -> str:
+    return "\n".join(json.dumps({k: v for k, v in r.items() if v is not None and v == v}, ensure_ascii=False,
+                                default=str) for r in df.to_dict("records"))
@@ -0,0 +1,347 @@
+# queries.py
+# 대시보드 쿼리 (streamlit 비의존 → app.py 캐시 래퍼, schema.py 실행계획 점검, bench/ 에서 그대로 사용)
+#  - WHERE 빌더 / 키워드 조건 / SQL 텍스트 / 연결(conn)을 받아 실행하는 run_* 함수
+#  - 후처리는 모두 벡터화(컬럼 단위) / NaT 안전 / 전달받은 DataFrame을 그대로 수정(복사 없음)
+
+import re
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+TEXT_COLS = ["description", "cause", "response", "note"]
+DIMS      = ["platform", "locale", "category"]
+LIKE_SQL  = "(" + " OR ".join(f"i.{c} LIKE :kw" for c in TEXT_COLS) + ")"
+LIVE_SQL  = "i.deleted_at IS NULL"   # soft delete(deleted_at 컬럼)가 있으면 원본 테이블 조회에 항상 붙는 조건
+MATCH_SQL = f"MATCH({', '.join('i.' + c for c in TEXT_COLS)}) AGAINST (:kw_ft IN BOOLEAN MODE)"
+
+# 마스터 목록은 요약 컬럼 + 첫 줄(desc_one)만 조회. 원문(description/cause/response/note)은 상세 조회
+LIST_COLS = """i.id, i.started_at, i.ended_at, i.duration, i.platform, i.locale, i.inquiry_count, i.category,
+               SUBSTRING_INDEX(SUBSTRING_INDEX(COALESCE(i.description, ''), CHAR(10), 1), CHAR(13), 1) AS desc_one"""
+
+IMPACT_SUMS = ["cnt", "timed", "downtime", "impact"]
+
+SEEK_SQL = "AND (i.started_at < :cur_ts OR (i.started_at = :cur_ts AND i.id < :cur_id))"
+
+
+def summary_sql(filter_sql: str, use_rollup: bool = False, live: bool = False) -> str:
+    """요약 엔진: (category, platform) 단위 1회 집계.
+    cnt = 선택 기간(:date_from~:date_to), month_cnt = 최근 30일(:month_from~:month_to).
+    use_rollup=True면 incidents_daily에서 집계 (파라미터는 날짜 단위, 삭제 표시된 행은 이미 빠져 있음).
+    live=True면 원본 테이블에서 삭제 표시된 행 제외."""
+    if use_rollup:
+        return f"""
+            SELECT NULLIF(i.category, '') AS category, NULLIF(i.platform, '') AS platform,
+                   SUM(CASE WHEN i.day BETWEEN :date_from  AND :date_to  THEN i.cnt ELSE 0 END) AS cnt,
+                   SUM(CASE WHEN i.day BETWEEN :month_from AND :month_to THEN i.cnt ELSE 0 END) AS month_cnt
+            FROM incidents_daily i
+            WHERE (i.day BETWEEN :date_from  AND :date_to
+                   OR i.day BETWEEN :month_from AND :month_to)
+              AND {filter_sql}
+            GROUP BY i.category, i.platform
+        """
+    return f"""
+        SELECT i.category, i.platform,
+               SUM(i.started_at BETWEEN :date_from  AND :date_to)  AS cnt,
+               SUM(i.started_at BETWEEN :month_from AND :month_to) AS month_cnt
+        FROM incidents i
+        WHERE (i.started_at BETWEEN :date_from  AND :date_to
+               OR i.started_at BETWEEN :month_from AND :month_to)
+          AND {filter_sql}{" AND " + LIVE_SQL if live else ""}
+        GROUP BY i.category, i.platform
+    """
+
+
+# 추이 버킷: 이름 → (MySQL DATE_FORMAT 형식, 대략 길이). week는 ISO 주(월요일 시작)
+TREND_BUCKETS = {
+    "hour":  ("%Y-%m-%d %H:00", timedelta(hours=1)),
+    "day":   ("%Y-%m-%d",       timedelta(days=1)),
+    "week":  ("%x-%v",          timedelta(days=7)),
+    "month": ("%Y-%m",          timedelta(days=30)),
+    "year":  ("%Y",             timedelta(days=365)),
+}
+MAX_TREND_BUCKETS = 60   # 버킷 수 상한 → 차트 포인트 ≤ 버킷 수 × (TREND_SERIES + 1)
+TREND_SERIES = 6         # 상위 계열만 따로, 나머지는 '기타'
+
+
+def trend_bucket(date_from: datetime, date_to: datetime) -> str:
+    """기간이 MAX_TREND_BUCKETS개 이하로 나뉘는 가장 작은 버킷."""
+    span = date_to - date_from
+    for name, (_, size) in TREND_BUCKETS.items():
+        if span / size <= MAX_TREND_BUCKETS:
+            return name
+    return "year"
+
+
+def trend_sql(filter_sql: str, bucket: str, by: str, use_rollup: bool = False, live: bool = False) -> str:
+    """(bucket 문자열, series, cnt) 집계. use_rollup=True면 incidents_daily (hour 버킷 불가, 파라미터는 날짜 단위).
+    live=True면 원본 테이블에서 삭제 표시된 행 제외."""
+    if by not in DIMS:
+        raise ValueError(f"알 수 없는 계열 기준: {by}")
+    fmt = TREND_BUCKETS[bucket][0]
+    if use_rollup:
+        return f"""
+            SELECT DATE_FORMAT(i.day, '{fmt}') AS bucket, NULLIF(i.{by}, '') AS series, SUM(i.cnt) AS cnt
+            FROM incidents_daily i
+            WHERE i.day BETWEEN :date_from AND :date_to AND {filter_sql}
+            GROUP BY 1, 2
+        """
+    return f"""
+        SELECT DATE_FORMAT(i.started_at, '{fmt}') AS bucket, i.{by} AS series, COUNT(*) AS cnt
+        FROM incidents i
+        WHERE i.started_at BETWEEN :date_from AND :date_to AND {filter_sql}{" AND " + LIVE_SQL if live else ""}
+        GROUP BY 1, 2
+    """
+
+
+def impact_sql(where_sql: str) -> str:
+    """장애시간 집계: (platform, category) 단위 1회 집계 (선택 기간 + 필터).
+    timed = 장애시간이 있는 건수, downtime = 장애시간(분) 합, impact = 장애시간 × 문의량 합."""
+    return f"""
+        SELECT i.platform, i.category,
+               COUNT(*)                                                 AS cnt,
+               COUNT(i.duration_minutes)                                AS timed,
+               SUM(i.duration_minutes)                                  AS downtime,
+               SUM(i.duration_minutes * COALESCE(i.inquiry_count, 0))   AS impact
+        FROM incidents i
+        WHERE {where_sql}
+        GROUP BY i.platform, i.category
+    """
+
+
+def list_sql(where_sql: str, seek: bool = False) -> str:
+    """목록: started_at, id 내림차순 :limit행. seek=True면 (:cur_ts, :cur_id) 다음부터(키셋 페이지)."""
+    return f"""
+        SELECT {LIST_COLS}
+        FROM incidents i
+        WHERE {where_sql} {SEEK_SQL if seek else ""}
+        ORDER BY i.started_at DESC, i.id DESC
+        LIMIT :limit
+    """
+
+
+def sql(stmt: str, params: dict | None = None):
+    """text() + 튜플 파라미터(IN :name)를 expanding bindparam으로 지정 (pymysql/sqlite 공통 동작)."""
+    t = text(stmt)
+    expanding = [bindparam(k, expanding=True) for k, v in (params or {}).items()
+                 if isinstance(v, (tuple, list)) and re.search(rf":{k}\b", stmt)]
+    return t.bindparams(*expanding) if expanding else t
+
+
+def keyword_clause(keyword: str, token_size: int = 0) -> tuple[str, dict]:
+    """키워드 WHERE 조각과 파라미터.
+    FULLTEXT 인덱스로 후보 id를 먼저 좁히고, 같은 LIKE 조건으로 재확인해 결과는 기존과 동일하게 유지한다.
+    token_size=0(인덱스 없음)이거나 ngram 토큰보다 짧은 키워드는 LIKE만 사용."""
+    kw = keyword.strip()
+    if not kw:
+        return "", {}
+    p = {"kw": f"%{kw}%"}
+    if not token_size or len(kw.replace(" ", "")) < token_size:
+        return LIKE_SQL, p
+    p["kw_ft"] = '"' + kw.replace('"', " ") + '"'   # 구문(phrase) 검색
+    return f"({MATCH_SQL} AND {LIKE_SQL})", p
+
+
+def build_filters(date_from: datetime, date_to: datetime, platforms=(), locales=(), categories=(),
+                  kw: tuple[str, dict] = ("", {})) -> tuple[dict, list[str]]:
+    """사이드바 선택 → (params, 날짜 외 조건 목록). 요약 엔진은 기간을 자체적으로 처리하므로 날짜는 params에만."""
+    params = {"date_from": date_from, "date_to": date_to}
+    filters = []
+    if platforms:
+        filters.append("i.platform IN :platforms");   params["platforms"]  = tuple(platforms)
+    if locales:
+        filters.append("i.locale IN :locales");       params["locales"]    = tuple(locales)
+    if categories:
+        filters.append("i.category IN :categories");  params["categories"] = tuple(categories)
+    kw_sql, kw_params = kw
+    if kw_sql:
+        filters.append(kw_sql);                       params.update(kw_params)
+    return params, filters
+
+
+def where_sqls(filters: list[str], live: bool = False) -> tuple[str, str]:
+    """(filter_sql: 날짜 외 조건, where_sql: 선택 기간 포함 전체 조건)
+    live=True면 where_sql에 삭제 표시 제외 조건 포함. filter_sql은 집계 테이블과 공용이라 제외
+    (요약/추이는 summary_sql/trend_sql의 live로)."""
+    filter_sql = " AND ".join(filters) or "1=1"
+    where_sql  = " AND ".join(["i.started_at BETWEEN :date_from AND :date_to"] + ([LIVE_SQL] if live else []) + filters)
+    return filter_sql, where_sql
+
+
+def has_soft_delete(conn) -> bool:
+    """incidents에 deleted_at(soft delete) 컬럼이 있으면 True."""
+    n = conn.execute(text("""
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'incidents' AND column_name = 'deleted_at'
+    """)).scalar()
+    return bool(n)
+
+
+# ---------------------------
+# 실행 (conn을 받아 실행, 캐시는 호출자 몫)
+# ---------------------------
+def catalog_sql(use_rollup: bool = False, live: bool = False) -> str:
+    """차원(플랫폼/로케일/카테고리) 값별 건수. use_rollup=True면 incidents_dims(수십 행)만 읽음."""
+    if use_rollup:
+        return "SELECT dim, value, cnt FROM incidents_dims"
+    return "\nUNION ALL\n".join(
+        f"SELECT '{d}' AS dim, {d} AS value, COUNT(*) AS cnt FROM incidents i "
+        f"WHERE {d}<>'' AND {d} IS NOT NULL{' AND ' + LIVE_SQL if live else ''} GROUP BY {d}"
+        for d in DIMS)
+
+
+def run_catalog(conn, use_rollup: bool = False, live: bool = False) -> dict[str, dict[str, int]]:
+    """차원 카탈로그: {차원: {값: 건수}} (값은 대소문자 무시 정렬)."""
+    df = pd.read_sql(text(catalog_sql(use_rollup, live)), conn)
+    df = df.sort_values("value", key=lambda s: s.astype(str).str.lower(), kind="stable")
+    out = {d: {} for d in DIMS}
+    for d, g in df.groupby("dim", sort=False):
+        out[d] = dict(zip(g["value"].astype(str), g["cnt"].astype("int64").tolist()))
+    return out
+
+
+def run_summary(conn, filter_sql: str, params: dict, use_rollup: bool = False,
+                now: datetime | None = None, live: bool = False) -> pd.DataFrame:
+    now = now or datetime.now()
+    p = dict(params)
+    p["month_from"] = now - timedelta(days=30)
+    p["month_to"]   = now
+    if use_rollup:
+        p["date_from"], p["date_to"]   = p["date_from"].date(),  p["date_to"].date()
+        p["month_from"], p["month_to"] = p["month_from"].date(), p["month_to"].date()
+    stmt = summary_sql(filter_sql, use_rollup, live)
+    df = pd.read_sql(sql(stmt, p), conn, params=p)
+    df[["cnt", "month_cnt"]] = df[["cnt", "month_cnt"]].fillna(0).astype("int64")
+    return df
+
+
+def run_trend(conn, filter_sql: str, params: dict, bucket: str, by: str = "category",
+              use_rollup: bool = False, live: bool = False) -> pd.DataFrame:
+    """추이: (bucket 시작 시각, series, cnt). hour 버킷은 항상 원본 테이블."""
+    use_rollup = use_rollup and bucket != "hour"
+    p = dict(params)
+    if use_rollup:
+        p["date_from"], p["date_to"] = p["date_from"].date(), p["date_to"].date()
+    df = pd.read_sql(sql(trend_sql(filter_sql, bucket, by, use_rollup, live), p), conn, params=p)
+    df["bucket"] = bucket_start(df["bucket"], bucket)
+    df["cnt"] = df["cnt"].fillna(0).astype("int64")
+    return top_series(df)
+
+
+def run_impact(conn, where_sql: str, params: dict) -> pd.DataFrame:
+    """(platform, category, cnt, timed, downtime, impact) — impact_by/impact_totals의 입력."""
+    df = pd.read_sql(sql(impact_sql(where_sql), params), conn, params=params)
+    df[IMPACT_SUMS] = df[IMPACT_SUMS].fillna(0).astype("int64")
+    return df
+
+
+def impact_totals(df: pd.DataFrame) -> dict:
+    """전체 MTTR(분, 장애시간 있는 건 기준)/총 장애시간(분)/영향도(문의×분)/장애시간 기록 비율."""
+    s = df[IMPACT_SUMS].sum()
+    return {"mttr": float(s["downtime"] / s["timed"]) if s["timed"] else None, "downtime": int(s["downtime"]),
+            "impact": int(s["impact"]), "coverage": float(s["timed"] / s["cnt"]) if s["cnt"] else None}
+
+
+def impact_by(df: pd.DataFrame, by: str) -> pd.DataFrame:
+    """run_impact 결과를 by(platform/category)별로 합쳐 MTTR 계산. 영향도 내림차순."""
+    g = df.groupby(by, dropna=False, as_index=False)[IMPACT_SUMS].sum()
+    g["mttr"] = (g["downtime"] / g["timed"].where(g["timed"] > 0)).round(1)
+    return g.sort_values(["impact", "downtime"], ascending=False, kind="stable").reset_index(drop=True)
+
+
+def run_list(conn, where_sql: str, params: dict, limit: int) -> pd.DataFrame:
+    p = dict(params); p["limit"] = int(limit)
+    stmt = list_sql(where_sql)
+    return format_list(pd.read_sql(sql(stmt, p), conn, params=p))
+
+
+def run_page(conn, where_sql: str, params: dict, cursor: tuple | None, page_size: int):
+    """키셋 페이지: (started_at, id) 내림차순에서 cursor 다음 page_size행. 반환 (df, next_cursor)."""
+    p = dict(params); p["limit"] = int(page_size) + 1   # 1행 더 읽어 다음 페이지 유무 판단
+    if cursor is not None:
+        p["cur_ts"], p["cur_id"] = cursor
+    stmt = list_sql(where_sql, seek=cursor is not None)
+    df = pd.read_sql(sql(stmt, p), conn, params=p)
+    next_cursor = None
+    if len(df) > page_size:
+        df = df.iloc[:page_size].copy()
+        last = df.iloc[-1]
+        next_cursor = (pd.Timestamp(last["started_at"]).to_pydatetime(), int(last["id"]))
+    return format_list(df), next_cursor
+
+
+def run_detail(conn, incident_id: int, live: bool = False) -> dict:
+    row = conn.execute(text(f"""
+        SELECT i.id, i.description, i.cause, i.response, i.note, i.created_at, i.updated_at
+        FROM incidents i
+        WHERE i.id = :id{" AND " + LIVE_SQL if live else ""}
+    """), {"id": int(incident_id)}).mappings().first()
+    if row is None:
+        return {}
+    d = dict(row)
+    for col in TEXT_COLS:
+        d[col] = "" if d[col] is None else re.sub(r"\r\n?", "\n", str(d[col]))
+    return d
+
+
+def bucket_start(keys: pd.Series, bucket: str) -> pd.Series:
+    """trend_sql의 bucket 문자열 → 구간 시작 시각."""
+    if bucket == "week":
+        return pd.to_datetime(keys.astype(str) + "-1", format="%G-%V-%u")
+    fmt = {"hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}[bucket]
+    return pd.to_datetime(keys.astype(str), format=fmt)
+
+
+def floor_bucket(ts: pd.Series, bucket: str) -> pd.Series:
+    """시각 → 구간 시작 시각 (trend_sql 버킷과 같은 규칙, 벡터화). 스냅샷 모드에서 사용."""
+    ts = pd.to_datetime(ts)
+    if bucket in ("hour", "day"):
+        return ts.dt.floor("h" if bucket == "hour" else "D")
+    return ts.dt.to_period({"week": "W-SUN", "month": "M", "year": "Y"}[bucket]).dt.start_time
+
+
+def fill_buckets(df: pd.DataFrame, bucket: str, date_from, date_to) -> pd.DataFrame:
+    """(bucket, series, cnt)에 기간 안의 빈 구간을 cnt=0으로 채움 → 차트에서 건수 없는 구간이 사라지지 않게."""
+    lo, hi = floor_bucket(pd.Series([pd.Timestamp(date_from), pd.Timestamp(date_to)]), bucket)
+    freq = {"hour": "h", "day": "D", "week": "W-MON", "month": "MS", "year": "YS"}[bucket]
+    full = pd.MultiIndex.from_product([pd.date_range(lo, hi, freq=freq), df["series"].unique()],
+                                      names=["bucket", "series"])
+    return (df.set_index(["bucket", "series"])["cnt"].reindex(full, fill_value=0)
+            .reset_index().sort_values(["bucket", "series"], kind="stable").reset_index(drop=True))
+
+
+def top_series(df: pd.DataFrame, n: int = TREND_SERIES) -> pd.DataFrame:
+    """(bucket, series, cnt)에서 합계 상위 n개 계열만 남기고 나머지는 '기타'로 합침. 결측 계열은 '(없음)'."""
+    df = df.assign(series=df["series"].fillna("(없음)").astype(str))
+    top = df.groupby("series")["cnt"].sum().nlargest(n).index
+    df["series"] = df["series"].where(df["series"].isin(top), "기타")
+    return (df.groupby(["bucket", "series"], as_index=False)["cnt"].sum()
+            .sort_values(["bucket", "series"], kind="stable").reset_index(drop=True))
+
+
+def format_dt(s: pd.Series) -> pd.Series:
+    """datetime 컬럼 → 'YYYY-MM-DD HH:MM' 문자열, 결측은 ''.
+    Series.dt.strftime은 원소별 파이썬 호출이라 numpy datetime_as_string으로 변환."""
+    v = pd.to_datetime(s, errors="coerce").to_numpy(dtype="datetime64[m]")
+    out = np.char.replace(np.datetime_as_string(v, unit="m"), "T", " ").astype(object)
+    out[np.isnat(v)] = ""
+    return pd.Series(out, index=s.index)
+
+
+def normalize_newlines(s: pd.Series) -> pd.Series:
+    """\\r\\n / \\r → \\n 을 정규식 한 번으로 치환. 결측은 ''."""
+    return s.fillna("").astype(str).str.replace(r"\r\n?", "\n", regex=True)
+
+
+def first_line(s: pd.Series) -> pd.Series:
+    """SQL의 desc_one과 같은 규칙(첫 \\n 또는 \\r 앞까지)을 pandas에서 계산할 때 사용."""
+    return s.fillna("").astype(str).str.extract(r"^([^\r\n]*)", expand=False)
+
+
+def format_list(df: pd.DataFrame) -> pd.DataFrame:
+    if not df.empty:
+        df["started_at"] = format_dt(df["started_at"])
+        df["ended_at"]   = format_dt(df["ended_at"])
+        df["desc_one"]   = df["desc_one"].fillna("")
+    return df
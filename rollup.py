@@ -0,0 +1,161 @@
+# rollup.py
+# 일별 집계 테이블(incidents_daily) 유지 (streamlit 비의존)
+#  - (day, platform, locale, category) 단위 건수/문의량 합계
+#  - 삭제/추가/업로드 시 같은 트랜잭션에서 영향받은 날짜만 다시 집계 (refresh_daily)
+#  - 재구축/복구는 월 단위 트랜잭션 (rebuild_daily)
+#  - 전체 재구축이 끝까지 끝나야 incidents_meta에 완성 표시 → 중간에 멈춘 집계를 완성본으로 믿지 않음
+#  - 첫 구축(ensure_rollup)은 GET_LOCK으로 한 프로세스만 진행, 나머지는 끝나길 기다렸다가 완성 표시를 확인
+#  - 차원 카탈로그(incidents_dims: 차원/값별 건수)는 일별 집계를 다시 계산할 때 전후 차이만큼 함께 갱신
+#  - soft delete(deleted_at)로 삭제 표시된 행은 집계에서 제외 → 집계/카탈로그를 읽는 쿼리는 따로 거를 필요 없음
+
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from queries import DIMS, LIVE_SQL, has_soft_delete
+
+# 기간(day) 안의 차원 값별 건수 (refresh 전후 비교용)
+DIM_COUNTS_SQL = "\nUNION ALL\n".join(
+    f"SELECT '{d}' AS dim, {d} AS value, SUM(cnt) AS cnt FROM incidents_daily "
+    f"WHERE day >= :d0 AND day < :d1 AND {d} <> '' GROUP BY {d}"
+    for d in DIMS)
+
+ROLLUP_MARK = "rollup_complete"          # incidents_meta.name: 전체 재구축 완료 시각
+ROLLUP_LOCK = "incidents_rollup_build"   # GET_LOCK 이름 (첫 구축 중복 방지)
+ROLLUP_LOCK_WAIT = int(os.getenv("ROLLUP_LOCK_WAIT") or 600)   # 다른 프로세스의 구축을 기다리는 최대 초
+
+
+def day_runs(started_ats) -> list[tuple]:
+    """started_at 목록 → 연속된 날짜 구간 [(첫날, 마지막날+1), ...]"""
+    days = sorted({t.normalize() for t in pd.to_datetime(pd.Series(list(started_ats))).dropna()})
+    runs = []
+    for d in days:
+        if runs and d <= runs[-1][1]:
+            runs[-1][1] = d + timedelta(days=1)
+        else:
+            runs.append([d, d + timedelta(days=1)])
+    return [(a.to_pydatetime(), b.to_pydatetime()) for a, b in runs]
+
+
+def dim_counts(conn, d0, d1) -> pd.Series:
+    df = pd.read_sql(text(DIM_COUNTS_SQL), conn, params={"d0": d0, "d1": d1})
+    return df.set_index(["dim", "value"])["cnt"].astype("int64")
+
+
+def locked_dim_counts(conn, d0, d1) -> pd.Series:
+    """기간 집계 행을 잠그고(FOR UPDATE) 읽은 차원 값별 건수.
+    잠금 읽기는 트랜잭션 스냅샷이 아니라 최신 커밋을 읽으므로, 같은 날짜를 동시에 갱신하는 트랜잭션은
+    여기서 차례로 진행되고 각자 앞 트랜잭션이 반영된 값을 기준으로 증감을 계산한다."""
+    df = pd.read_sql(text("SELECT platform, locale, category, cnt FROM incidents_daily "
+                          "WHERE day >= :d0 AND day < :d1 FOR UPDATE"), conn, params={"d0": d0, "d1": d1})
+    long = df.melt(id_vars="cnt", value_vars=DIMS, var_name="dim", value_name="value")
+    long = long[long["value"] != ""]
+    return long.groupby(["dim", "value"])["cnt"].sum().astype("int64")
+
+
+def apply_dim_delta(conn, delta: pd.Series):
+    """(dim, value) → 증감 건수를 incidents_dims에 반영. 0건이 된 값은 삭제."""
+    for (dim, value), n in delta[delta != 0].items():
+        p = {"dim": dim, "value": value, "n": int(n)}
+        if not conn.execute(text("UPDATE incidents_dims SET cnt = cnt + :n WHERE dim = :dim AND value = :value"),
+                            p).rowcount:
+            conn.execute(text("INSERT INTO incidents_dims (dim, value, cnt) VALUES (:dim, :value, :n)"), p)
+    conn.execute(text("DELETE FROM incidents_dims WHERE cnt <= 0"))
+
+
+def rebuild_dims(conn):
+    """incidents_dims를 incidents_daily 전체 합계로 다시 채움."""
+    conn.execute(text("DELETE FROM incidents_dims"))
+    conn.execute(text("INSERT INTO incidents_dims (dim, value, cnt)\n" + "\nUNION ALL\n".join(
+        f"SELECT '{d}', {d}, SUM(cnt) FROM incidents_daily WHERE {d} <> '' GROUP BY {d}" for d in DIMS)))
+
+
+def refresh_daily(conn, started_ats, live: bool | None = None):
+    """started_ats가 속한 날짜의 집계를 원본에서 다시 계산 (호출자의 트랜잭션 안에서 실행).
+    live: deleted_at 컬럼 유무 (None이면 조회)."""
+    if live is None:
+        live = has_soft_delete(conn)
+    for d0, d1 in day_runs(started_ats):
+        p = {"d0": d0.date(), "d1": d1.date()}
+        before = locked_dim_counts(conn, **p)   # 일반 읽기(스냅샷)면 동시 갱신끼리 같은 before로 증감이 겹침
+        conn.execute(text("DELETE FROM incidents_daily WHERE day >= :d0 AND day < :d1"), p)
+        conn.execute(text(f"""
+            INSERT INTO incidents_daily (day, platform, locale, category, cnt, inquiry_sum)
+            SELECT DATE(i.started_at), COALESCE(i.platform, ''), COALESCE(i.locale, ''), COALESCE(i.category, ''),
+                   COUNT(*), COALESCE(SUM(i.inquiry_count), 0)
+            FROM incidents i
+            WHERE i.started_at >= :d0 AND i.started_at < :d1{" AND " + LIVE_SQL if live else ""}
+            GROUP BY 1, 2, 3, 4
+        """), {"d0": d0, "d1": d1})
+        apply_dim_delta(conn, dim_counts(conn, **p).sub(before, fill_value=0))
+
+
+def rollup_complete(conn) -> bool:
+    """전체 재구축이 끝까지 완료된 집계 테이블이면 True."""
+    if not inspect(conn).has_table("incidents_meta"):
+        return False
+    return conn.execute(text("SELECT 1 FROM incidents_meta WHERE name = :n"), {"n": ROLLUP_MARK}).first() is not None
+
+
+def set_rollup_complete(conn, done: bool):
+    if not inspect(conn).has_table("incidents_meta"):
+        from schema import META_DDL
+        conn.execute(text(META_DDL))
+    conn.execute(text("DELETE FROM incidents_meta WHERE name = :n"), {"n": ROLLUP_MARK})
+    if done:
+        conn.execute(text("INSERT INTO incidents_meta (name, value) VALUES (:n, :v)"),
+                     {"n": ROLLUP_MARK, "v": datetime.now().isoformat(timespec="seconds")})
+
+
+def rebuild_daily(engine, d_from=None, d_to=None, progress=None) -> int:
+    """재구축/복구: 기간(미지정 시 전체)을 월 단위 트랜잭션으로 다시 집계. 처리한 월 수 반환.
+    전체 재구축은 시작할 때 완성 표시를 지우고, 범위 밖 집계 정리 + 카탈로그 재계산까지 마친 뒤 다시 표시."""
+    full = d_from is None and d_to is None
+    with engine.begin() as conn:
+        lo, hi = conn.execute(text("SELECT MIN(started_at), MAX(started_at) FROM incidents")).first()
+        live = has_soft_delete(conn)
+        if full:
+            set_rollup_complete(conn, False)
+    if lo is None:
+        if full:
+            with engine.begin() as conn:
+                conn.execute(text("DELETE FROM incidents_daily"))
+                rebuild_dims(conn)
+                set_rollup_complete(conn, True)
+        return 0
+    lo = pd.Timestamp(d_from or lo).normalize()
+    hi = pd.Timestamp(d_to or hi).normalize() + timedelta(days=1)
+    starts = list(pd.date_range(lo.replace(day=1), hi, freq="MS"))
+    for n, m0 in enumerate(starts, 1):
+        d0 = max(m0, lo).to_pydatetime()
+        d1 = min(m0 + pd.offsets.MonthBegin(1), hi).to_pydatetime()
+        with engine.begin() as conn:
+            refresh_daily(conn, pd.date_range(d0, d1 - timedelta(days=1), freq="D"), live)
+        if progress:
+            progress(n / len(starts))
+    if full:
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM incidents_daily WHERE day < :lo OR day >= :hi"),
+                         {"lo": lo.date(), "hi": hi.date()})
+            rebuild_dims(conn)
+            set_rollup_complete(conn, True)
+    return len(starts)
+
+
+def ensure_rollup(engine, wait: int = ROLLUP_LOCK_WAIT) -> bool:
+    """완성 표시가 없으면 전체 재구축. GET_LOCK으로 프로세스 간 한 곳만 진행하고, 잠금을 기다린 쪽은
+    앞 프로세스가 끝낸 완성 표시를 확인해 건너뜀. 반환: 이번에 재구축했으면 True.
+    wait초 안에 잠금을 못 얻으면 TimeoutError."""
+    with engine.connect() as lock:
+        if not lock.execute(text("SELECT GET_LOCK(:n, :t)"), {"n": ROLLUP_LOCK, "t": wait}).scalar():
+            raise TimeoutError(f"다른 프로세스가 일별 집계를 구축 중입니다 ({wait}초 대기 초과)")
+        try:
+            with engine.connect() as conn:
+                if rollup_complete(conn):
+                    return False
+            rebuild_daily(engine)
+            return True
+        finally:
+            lock.execute(text("SELECT RELEASE_LOCK(:n)"), {"n": ROLLUP_LOCK})
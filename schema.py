@@ -0,0 +1,277 @@
+# schema.py
+# incidents 테이블 스키마/인덱스 관리 (streamlit 비의존)
+#  - 테이블이 없으면 생성, 있으면 빠진 컬럼/인덱스만 추가 (migrate)
+#  - 인덱스는 대시보드 WHERE 패턴 기준: started_at 범위 + platform/locale/category IN
+#  - 대표 대시보드 쿼리를 EXPLAIN 해서 전체 스캔(type=ALL)이면 경고 (plan_warnings)
+# 실행: python schema.py [--fulltext] [--content-key] [--duration] [--check]   (DB_HOST/DB_PORT/DB_USER/DB_PASSWORD/DB_NAME)
+
+import argparse
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+from dbpool import pool_options
+from importer import KEY_INDEX
+from queries import TEXT_COLS, list_sql, summary_sql
+from rollup import rebuild_dims
+
+INCIDENTS_DDL = """
+    CREATE TABLE IF NOT EXISTS incidents (
+        id             BIGINT       NOT NULL AUTO_INCREMENT,
+        started_at     DATETIME     NULL,
+        ended_at       DATETIME     NULL,
+        duration       VARCHAR(100) NULL,
+        platform       VARCHAR(100) NULL,
+        locale         VARCHAR(100) NULL,
+        inquiry_count  INT          NULL DEFAULT 0,
+        category       VARCHAR(100) NULL,
+        description    TEXT         NULL,
+        cause          TEXT         NULL,
+        response       TEXT         NULL,
+        note           TEXT         NULL,
+        content_key    CHAR(40)     NULL,
+        duration_minutes INT        NULL,
+        deleted_at     DATETIME     NULL,
+        created_at     DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at     DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (id),
+        UNIQUE KEY {KEY_INDEX} (content_key)
+    ) DEFAULT CHARSET=utf8mb4
+""".format(KEY_INDEX=KEY_INDEX)
+
+# 일별 집계 (day, platform, locale, category) → 건수/문의량 합계
+ROLLUP_DDL = """
+    CREATE TABLE IF NOT EXISTS incidents_daily (
+        day          DATE         NOT NULL,
+        platform     VARCHAR(100) NOT NULL DEFAULT '',
+        locale       VARCHAR(100) NOT NULL DEFAULT '',
+        category     VARCHAR(100) NOT NULL DEFAULT '',
+        cnt          INT          NOT NULL,
+        inquiry_sum  BIGINT       NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, platform, locale, category)
+    ) DEFAULT CHARSET=utf8mb4
+"""
+
+# 차원 카탈로그 (dim: platform/locale/category, value) → 건수. incidents_daily와 같은 트랜잭션에서 증감
+DIMS_DDL = """
+    CREATE TABLE IF NOT EXISTS incidents_dims (
+        dim    VARCHAR(20)  NOT NULL,
+        value  VARCHAR(100) NOT NULL,
+        cnt    BIGINT       NOT NULL DEFAULT 0,
+        PRIMARY KEY (dim, value)
+    ) DEFAULT CHARSET=utf8mb4
+"""
+
+# 메타 정보 (이름 → 값). 예: rollup_complete = 일별 집계 전체 재구축 완료 시각
+META_DDL = """
+    CREATE TABLE IF NOT EXISTS incidents_meta (
+        name        VARCHAR(50)  NOT NULL,
+        value       VARCHAR(255) NULL,
+        updated_at  DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (name)
+    ) DEFAULT CHARSET=utf8mb4
+"""
+
+# 삭제 감사 로그: 삭제 작업(job)별 대상 행. 영구 삭제는 삭제 직전 행 전체(row_json)를 남겨 복구 가능
+AUDIT_DDL = """
+    CREATE TABLE IF NOT EXISTS incidents_audit (
+        id           BIGINT       NOT NULL AUTO_INCREMENT,
+        job_id       CHAR(32)     NOT NULL,
+        action       VARCHAR(20)  NOT NULL,
+        incident_id  BIGINT       NOT NULL,
+        started_at   DATETIME     NULL,
+        row_json     MEDIUMTEXT   NULL,
+        actor        VARCHAR(100) NULL,
+        reason       VARCHAR(255) NULL,
+        created_at   DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id),
+        KEY ix_audit_job (job_id),
+        KEY ix_audit_incident (incident_id)
+    ) DEFAULT CHARSET=utf8mb4
+"""
+
+# 기존 테이블에 없을 수 있는 컬럼 (이름 → 정의)
+COLUMNS = {
+    "content_key": "CHAR(40) NULL",
+    "duration_minutes": "INT NULL",
+    "deleted_at":  "DATETIME NULL",
+    "created_at":  "DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP",
+    "updated_at":  "DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP",
+}
+
+# B-tree 인덱스 (이름 → 컬럼)
+#  - started_at 단독: 목록 ORDER BY started_at, id (InnoDB 보조 인덱스 끝에 PK가 붙어 키셋 정렬 그대로 사용)
+#  - started_at + 차원: 기간 요약 GROUP BY category, platform 을 인덱스만으로 처리(커버링)
+#  - platform/category 선두: 해당 IN 필터 + 기간 범위
+#  - updated_at: 로컬 스냅샷 증분 동기화 (updated_at >= 마지막 동기화 시각)
+#  - started_at + 차원 + 장애시간/문의량: MTTR/장애시간/영향도 집계를 인덱스만으로 처리(커버링)
+#  - deleted_at 선두: soft delete 조건(deleted_at IS NULL)은 등치로 취급 → 그 안에서 기간 범위/정렬 + 요약 커버링
+INDEXES = {
+    "ix_incidents_started":          ["started_at"],
+    "ix_incidents_started_dims":     ["started_at", "platform", "category", "locale"],
+    "ix_incidents_platform_started": ["platform", "started_at"],
+    "ix_incidents_category_started": ["category", "started_at"],
+    "ix_incidents_updated":          ["updated_at"],
+    "ix_incidents_started_impact":   ["started_at", "platform", "category", "duration_minutes", "inquiry_count",
+                                      "deleted_at"],
+    "ix_incidents_live_started":     ["deleted_at", "started_at", "platform", "category", "locale"],
+}
+
+FT_INDEX = "ft_incidents_text"
+
+
+def engine_from_env():
+    host, port = os.getenv("DB_HOST"), int(os.getenv("DB_PORT") or 3306)
+    user, pw, name = os.getenv("DB_USER"), os.getenv("DB_PASSWORD"), os.getenv("DB_NAME")
+    if not all([host, user, pw, name]):
+        raise SystemExit("DB_HOST/DB_USER/DB_PASSWORD/DB_NAME 환경변수가 필요합니다.")
+    url = f"mysql+pymysql://{user}:{pw}@{host}:{port}/{name}?charset=utf8mb4"
+    return create_engine(url, connect_args={"ssl": {"ssl": True}}, **pool_options())
+
+
+def existing_columns(conn, table: str = "incidents") -> set[str]:
+    return set(conn.execute(text("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = :t
+    """), {"t": table}).scalars())
+
+
+def existing_indexes(conn, table: str = "incidents") -> set[str]:
+    return set(conn.execute(text("""
+        SELECT DISTINCT index_name FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = :t
+    """), {"t": table}).scalars())
+
+
+def index_columns(conn, table: str = "incidents") -> dict[str, list[str]]:
+    """인덱스 이름 → 컬럼 목록(인덱스 내 순서)."""
+    cols = {}
+    for name, col in conn.execute(text("""
+        SELECT index_name, column_name FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = :t
+        ORDER BY index_name, seq_in_index
+    """), {"t": table}):
+        cols.setdefault(name, []).append(col)
+    return cols
+
+
+def missing_indexes(conn) -> list[str]:
+    """INDEXES 중 없거나 컬럼 구성이 다른(이전 버전 정의) 인덱스 이름."""
+    have = index_columns(conn)
+    return [name for name, cols in INDEXES.items()
+            if [c.lower() for c in have.get(name, [])] != [c.lower() for c in cols]]
+
+
+def fulltext_ddl() -> str:
+    """한국어 검색용 ngram FULLTEXT 인덱스 (테이블 크기에 따라 수 분 소요)."""
+    return f"ALTER TABLE incidents ADD FULLTEXT INDEX {FT_INDEX} ({', '.join(TEXT_COLS)}) WITH PARSER ngram"
+
+
+def fulltext_token_size(conn) -> int:
+    """incidents에 FULLTEXT 인덱스가 있으면 ngram 토큰 크기, 없으면 0."""
+    if FT_INDEX not in existing_indexes(conn):
+        return 0
+    return int(conn.execute(text("SELECT @@ngram_token_size")).scalar() or 2)
+
+
+def migrate(engine, fulltext: bool = False, content_key: bool = False, duration: bool = False,
+            log=print) -> list[str]:
+    """테이블 생성 + 빠진 컬럼/인덱스 추가. 실행한 DDL 목록 반환 (이미 최신이면 빈 목록).
+    fulltext=True면 FULLTEXT 인덱스, content_key=True면 중복제거 키, duration=True면 장애시간(분) 백필까지 진행."""
+    done = []
+
+    def run(conn, sql):
+        log(sql.strip().splitlines()[0] + (" ..." if "\n" in sql.strip() else ""))
+        conn.execute(text(sql))
+        done.append(sql)
+
+    with engine.begin() as conn:
+        tables = set(conn.execute(text(
+            "SELECT table_name FROM information_schema.tables WHERE table_schema = DATABASE()")).scalars())
+        if "incidents" not in tables:
+            run(conn, INCIDENTS_DDL)
+        cols = existing_columns(conn)
+        for name, ddl in COLUMNS.items():
+            if name not in cols:
+                run(conn, f"ALTER TABLE incidents ADD COLUMN {name} {ddl}")
+        have = existing_indexes(conn)
+        for name in missing_indexes(conn):   # 정의가 바뀐 인덱스는 다시 만듦
+            drop = f"DROP INDEX {name}, " if name in have else ""
+            run(conn, f"ALTER TABLE incidents {drop}ADD INDEX {name} ({', '.join(INDEXES[name])})")
+        if fulltext and FT_INDEX not in existing_indexes(conn):
+            run(conn, fulltext_ddl())
+        if "incidents_daily" not in tables:
+            run(conn, ROLLUP_DDL)
+        if "incidents_dims" not in tables:
+            run(conn, DIMS_DDL)
+            rebuild_dims(conn)
+        if "incidents_audit" not in tables:
+            run(conn, AUDIT_DDL)
+        if "incidents_meta" not in tables:
+            run(conn, META_DDL)
+    if content_key:
+        from importer import migrate_content_key
+        res = migrate_content_key(engine)
+        log(f"content_key 백필: {res['keyed']}건, 기존 중복 {res['duplicates']}건")
+    if duration:
+        from importer import migrate_duration
+        res = migrate_duration(engine)
+        log(f"duration_minutes 백필: {res['filled']}건, 해석 불가 {res['unparsed']}건")
+    return done
+
+
+def plan_queries(platform: str = "-", category: str = "-") -> list[tuple[str, str, dict]]:
+    """실행계획을 점검할 대표 대시보드 쿼리 (이름, SQL, 파라미터). 기본 화면 = 최근 30일."""
+    now = datetime.now()
+    p = {"date_from": now - timedelta(days=30), "date_to": now,
+         "month_from": now - timedelta(days=30), "month_to": now, "limit": 500}
+    by_pf = dict(p, platforms=(platform,))
+    by_cat = dict(p, categories=(category,))
+    seek = dict(p, cur_ts=now - timedelta(days=7), cur_id=2**62)
+    rng = "i.started_at BETWEEN :date_from AND :date_to"
+    return [
+        ("요약",             summary_sql("1=1"), p),
+        ("요약(플랫폼)",     summary_sql("i.platform IN :platforms"), by_pf),
+        ("요약(카테고리)",   summary_sql("i.category IN :categories"), by_cat),
+        ("목록",             list_sql(rng), p),
+        ("목록(플랫폼)",     list_sql(f"{rng} AND i.platform IN :platforms"), by_pf),
+        ("목록 페이지",      list_sql(rng, seek=True), seek),
+    ]
+
+
+def plan_warnings(conn, queries=None) -> list[str]:
+    """EXPLAIN 결과 incidents(i)를 전체 스캔(type=ALL)하는 쿼리마다 경고 문구 반환."""
+    warnings = []
+    for name, sql, params in queries or plan_queries():
+        for row in conn.execute(text("EXPLAIN " + sql), params).mappings():
+            if row.get("table") == "i" and str(row.get("type")).upper() == "ALL":
+                warnings.append(f"{name}: 전체 스캔 (예상 {row.get('rows')}행, 후보 인덱스 {row.get('possible_keys') or '없음'})")
+    return warnings
+
+
+def main():
+    ap = argparse.ArgumentParser(description="incidents 스키마 생성/마이그레이션 + 실행계획 점검")
+    ap.add_argument("--fulltext", action="store_true", help="ngram FULLTEXT 인덱스도 생성")
+    ap.add_argument("--content-key", action="store_true", help="중복제거 키(content_key) 생성/백필")
+    ap.add_argument("--duration", action="store_true", help="장애시간(분)(duration_minutes) 백필")
+    ap.add_argument("--check", action="store_true", help="마이그레이션 없이 점검만")
+    args = ap.parse_args()
+
+    engine = engine_from_env()
+    if not args.check:
+        ran = migrate(engine, fulltext=args.fulltext, content_key=args.content_key, duration=args.duration)
+        print(f"마이그레이션 완료: DDL {len(ran)}건")
+    with engine.connect() as conn:
+        missing = missing_indexes(conn)
+        warnings = plan_warnings(conn)
+    for name in missing:
+        print(f"[누락/변경 인덱스] {name} ({', '.join(INDEXES[name])})")
+    for w in warnings:
+        print(f"[전체 스캔] {w}")
+    if not missing and not warnings:
+        print("점검 이상 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+# snapshot.py
+# 로컬 컬럼형 스냅샷 (선택 기능: pyarrow 필요, streamlit 비의존)
+#  - incidents를 Arrow IPC 파일로 보관하고 memory-map으로 열어 프로세스 안의 모든 세션이 공유
+#  - 동기화: updated_at이 마지막 동기화 시각(DB 시계, 여유 SYNC_SLACK) 이후인 행만 가져와 id 기준 교체,
+#    DB 행 수와 다르면 id 목록으로 삭제 반영. 파일은 임시 파일에 쓴 뒤 교체(os.replace)
+#  - soft delete(deleted_at) 컬럼이 있으면 삭제 표시된 행은 가져오지 않음 → 행 수 비교로 스냅샷에서도 빠짐
+#  - 테이블은 started_at, id 내림차순으로 정렬해 두어 필터 결과가 곧 목록 순서
+#  - 필터/집계는 pyarrow.compute 벡터 연산 → queries.run_summary/run_list/run_page와 같은 모양의 결과
+
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from queries import DIMS, TEXT_COLS, first_line, floor_bucket, format_list, has_soft_delete, top_series
+
+SNAPSHOT_COLS = ["id", "started_at", "ended_at", "duration", "platform", "locale", "inquiry_count", "category",
+                 *TEXT_COLS, "updated_at"]
+LIST_OUT_COLS = ["id", "started_at", "ended_at", "duration", "platform", "locale", "inquiry_count", "category",
+                 "desc_one"]
+SYNC_SLACK = timedelta(seconds=60)   # updated_at(초 단위)과 커밋 지연 여유. 겹친 행은 id로 교체
+LOAD_CHUNK = 50_000
+DEFAULT_PATH = os.path.join(".snapshot", "incidents.arrow")
+
+
+def snapshot_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def arrow_schema():
+    import pyarrow as pa
+    ts, s = pa.timestamp("us"), pa.large_string()
+    return pa.schema([("id", pa.int64()), ("started_at", ts), ("ended_at", ts), ("duration", s),
+                      ("platform", s), ("locale", s), ("inquiry_count", pa.int64()), ("category", s),
+                      *[(c, s) for c in TEXT_COLS], ("updated_at", ts)])
+
+
+def open_snapshot(path: str = DEFAULT_PATH) -> dict:
+    """스냅샷 상태 dict. 파일이 있으면 memory-map으로 연다 (없으면 첫 sync에서 전체 적재)."""
+    state = {"lock": threading.Lock(), "path": path, "table": None, "synced_at": None,
+             "checked": 0.0, "dirty": False, "stats": {}}
+    if os.path.exists(path):
+        try:
+            _map(state)
+        except Exception:
+            state["table"] = None   # 깨진 파일 → 전체 재적재
+    return state
+
+
+def _map(state: dict):
+    import pyarrow as pa
+    with pa.memory_map(state["path"], "r") as src:
+        table = pa.ipc.open_file(src).read_all()
+    meta = table.schema.metadata or {}
+    state["table"] = table
+    state["synced_at"] = datetime.fromisoformat(meta[b"synced_at"].decode()) if b"synced_at" in meta else None
+
+
+def _write(state: dict, table, synced_at: datetime):
+    import pyarrow as pa
+    os.makedirs(os.path.dirname(state["path"]) or ".", exist_ok=True)
+    table = table.replace_schema_metadata({"synced_at": synced_at.isoformat()})
+    # 같은 경로를 동기화하는 다른 프로세스/스레드와 겹치지 않게 임시 파일 이름은 매번 새로
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(state["path"]) or ".",
+                               prefix=os.path.basename(state["path"]) + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, state["path"])
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    _map(state)
+
+
+def _to_arrow(df: pd.DataFrame):
+    import pyarrow as pa
+    for c in ["started_at", "ended_at", "updated_at"]:
+        df[c] = pd.to_datetime(df[c], errors="coerce")
+    df["inquiry_count"] = pd.to_numeric(df["inquiry_count"], errors="coerce").astype("Int64")
+    return pa.Table.from_pandas(df[SNAPSHOT_COLS], schema=arrow_schema(), preserve_index=False)
+
+
+def _sorted(table):
+    return table.sort_by([("started_at", "descending"), ("id", "descending")])
+
+
+def _fetch(conn, where: str, params: dict, live: str = "1=1") -> pd.DataFrame:
+    return pd.read_sql(text(f"SELECT {', '.join(SNAPSHOT_COLS)} FROM incidents WHERE {live} AND {where}"), conn,
+                       params=params)
+
+
+def sync(state: dict, engine) -> dict:
+    """DB → 스냅샷 증분 동기화. 반환: 가져온 행/삭제 행/전체 행/소요 ms/동기화 시각."""
+    with state["lock"]:
+        return _sync(state, engine)
+
+
+def _sync(state: dict, engine) -> dict:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    t0 = time.perf_counter()
+    with engine.connect() as conn:
+        now = pd.Timestamp(conn.execute(text("SELECT CURRENT_TIMESTAMP")).scalar()).to_pydatetime()
+        table, fetched, removed = state["table"], 0, 0
+        live = "deleted_at IS NULL" if has_soft_delete(conn) else "1=1"
+        if table is None or state["synced_at"] is None:
+            parts, last_id = [], 0
+            while True:
+                df = _fetch(conn, "id > :last_id ORDER BY id LIMIT :n", {"last_id": last_id, "n": LOAD_CHUNK},
+                            live)
+                if df.empty:
+                    break
+                last_id = int(df["id"].iloc[-1])
+                parts.append(_to_arrow(df))
+                fetched += len(df)
+            table = pa.concat_tables(parts) if parts else arrow_schema().empty_table()
+        else:
+            df = _fetch(conn, "updated_at >= :since", {"since": state["synced_at"] - SYNC_SLACK}, live)
+            if not df.empty:
+                changed = _to_arrow(df)
+                table = table.filter(pc.invert(pc.is_in(table["id"], value_set=changed["id"])))
+                table = pa.concat_tables([table, changed])
+                fetched = len(df)
+            if conn.execute(text(f"SELECT COUNT(*) FROM incidents WHERE {live}")).scalar() != table.num_rows:
+                ids = conn.execute(text(f"SELECT id FROM incidents WHERE {live}")).scalars().all()
+                ids = pa.array(ids, pa.int64())
+                keep = pc.is_in(table["id"], value_set=ids)
+                removed = table.num_rows - pc.sum(keep).as_py()
+                table = table.filter(keep)
+        if fetched or removed or state["table"] is None or state["synced_at"] is None:
+            _write(state, _sorted(table), now)
+        else:
+            state["synced_at"] = now
+        state["checked"], state["dirty"] = time.monotonic(), False
+        state["stats"] = {"fetched": fetched, "removed": removed, "rows": state["table"].num_rows,
+                          "ms": round((time.perf_counter() - t0) * 1000, 1), "synced_at": now}
+    return state["stats"]
+
+
+def is_stale(state: dict, max_age: float) -> bool:
+    return state["dirty"] or state["table"] is None or time.monotonic() - state["checked"] >= max_age
+
+
+def sync_if_stale(state: dict, engine, max_age: float) -> dict:
+    """쓰기 후(dirty)이거나 마지막 확인 후 max_age초가 지났으면 동기화.
+    다른 스레드가 이미 동기화 중이면 기다리지 않고 현재 상태를 반환 (테이블이 아직 없을 때만 기다림)."""
+    if not is_stale(state, max_age):
+        return state["stats"]
+    if state["table"] is None:
+        return sync(state, engine)
+    if not state["lock"].acquire(blocking=False):
+        return state["stats"]
+    try:
+        return _sync(state, engine) if is_stale(state, max_age) else state["stats"]
+    finally:
+        state["lock"].release()
+
+
+# ---------------------------
+# 필터/집계 (queries.py run_* 와 같은 결과 모양)
+# ---------------------------
+def _between(col, lo, hi):
+    import pyarrow.compute as pc
+    return pc.and_(pc.greater_equal(col, lo), pc.less_equal(col, hi))
+
+
+def filter_mask(table, params: dict, keyword: str = "", dated: bool = True):
+    """build_filters의 params(platforms/locales/categories) + 키워드(대소문자 무시 부분일치) 마스크.
+    dated=True면 params의 date_from~date_to 조건 포함."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    mask = pa.array(np.ones(table.num_rows, dtype=bool)) if not dated else _between(
+        table["started_at"], params["date_from"], params["date_to"])
+    for col, key in [("platform", "platforms"), ("locale", "locales"), ("category", "categories")]:
+        if params.get(key):
+            mask = pc.and_(mask, pc.is_in(table[col], value_set=pa.array(list(params[key]), pa.large_string())))
+    kw = keyword.strip()
+    if kw:
+        hit = None
+        for c in TEXT_COLS:
+            m = pc.fill_null(pc.match_substring(table[c], kw, ignore_case=True), False)
+            hit = m if hit is None else pc.or_(hit, m)
+        mask = pc.and_(mask, hit)
+    return pc.fill_null(mask, False)
+
+
+def snap_summary(state: dict, params: dict, keyword: str = "", now: datetime | None = None) -> pd.DataFrame:
+    """run_summary와 같은 (category, platform, cnt, month_cnt)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    now = now or datetime.now()
+    table = state["table"]
+    base = filter_mask(table, params, keyword, dated=False)
+    in_range = pc.fill_null(_between(table["started_at"], params["date_from"], params["date_to"]), False)
+    in_month = pc.fill_null(_between(table["started_at"], now - timedelta(days=30), now), False)
+    keep = pc.and_(base, pc.or_(in_range, in_month))
+    t = pa.table({"category": table["category"], "platform": table["platform"],
+                  "cnt": pc.cast(in_range, pa.int64()), "month_cnt": pc.cast(in_month, pa.int64())}).filter(keep)
+    g = t.group_by(["category", "platform"], use_threads=False).aggregate([("cnt", "sum"), ("month_cnt", "sum")])
+    df = g.rename_columns([c.removesuffix("_sum") for c in g.column_names]).to_pandas()
+    return df[["category", "platform", "cnt", "month_cnt"]].astype({"cnt": "int64", "month_cnt": "int64"})
+
+
+def snap_trend(state: dict, params: dict, keyword: str, bucket: str, by: str = "category") -> pd.DataFrame:
+    """run_trend와 같은 (bucket, series, cnt)."""
+    if by not in DIMS:
+        raise ValueError(f"알 수 없는 계열 기준: {by}")
+    table = state["table"]
+    df = table.select(["started_at", by]).filter(filter_mask(table, params, keyword)).to_pandas()
+    df = pd.DataFrame({"bucket": floor_bucket(df["started_at"], bucket), "series": df[by]})
+    df = df.groupby(["bucket", "series"], dropna=False).size().rename("cnt").reset_index()
+    return top_series(df)
+
+
+def _rows(table, mask, limit: int) -> pd.DataFrame:
+    import pyarrow.compute as pc
+    idx = pc.indices_nonzero(mask)[:limit]
+    cols = [c for c in LIST_OUT_COLS if c != "desc_one"] + ["description"]
+    df = table.select(cols).take(idx).to_pandas()
+    df["desc_one"] = first_line(df.pop("description"))
+    return df[LIST_OUT_COLS]
+
+
+def snap_list(state: dict, params: dict, keyword: str, limit: int) -> pd.DataFrame:
+    """run_list와 같은 목록 (started_at, id 내림차순 limit행)."""
+    table = state["table"]
+    return format_list(_rows(table, filter_mask(table, params, keyword), int(limit)))
+
+
+def snap_page(state: dict, params: dict, keyword: str, cursor: tuple | None, page_size: int):
+    """run_page와 같은 키셋 페이지. 반환 (df, next_cursor)."""
+    import pyarrow.compute as pc
+    table = state["table"]
+    mask = filter_mask(table, params, keyword)
+    if cursor is not None:
+        cur_ts, cur_id = cursor
+        ts = table["started_at"]
+        seek = pc.or_(pc.less(ts, cur_ts), pc.and_(pc.equal(ts, cur_ts), pc.less(table["id"], cur_id)))
+        mask = pc.and_(mask, pc.fill_null(seek, False))
+    df = _rows(table, mask, int(page_size) + 1)
+    next_cursor = None
+    if len(df) > page_size:
+        df = df.iloc[:page_size].copy()
+        last = df.iloc[-1]
+        next_cursor = (pd.Timestamp(last["started_at"]).to_pydatetime(), int(last["id"]))
+    return format_list(df), next_cursor
@@ -0,0 +1,146 @@
+# swr.py
+# stale-while-revalidate 조회 캐시 (streamlit 비의존)
+#  - ttl 이내: 저장된 결과 (hit)
+#  - ttl 초과 ~ max_stale 이내: 저장된 결과를 바로 돌려주고 갱신은 refresh(백그라운드)로 (stale)
+#  - 결과 없음/max_stale 초과: 호출한 스레드가 직접 조회 (miss). 같은 키를 동시에 요청한 스레드는 그 결과를 기다림
+#  - 키당 진행 중인 조회/갱신은 1건 (동시 만료 시 DB로 몰리지 않음)
+#  - 갱신 실패 시 직전 결과를 유지하고 다음 요청에서 다시 갱신. 항목 수는 max_entries (LRU)
+#  - clear()는 세대(generation)를 올림 → clear 전에 시작한 조회/갱신 결과는 저장하지 않음 (DDL 전 결과가 남지 않게)
+
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future
+
+STAT_KEYS = ["hits", "stale", "misses", "coalesced", "refreshes", "errors"]
+
+
+def open_cache(max_entries: int = 256) -> dict:
+    """캐시 상태 dict. entries: 키 → {"value", "at"(monotonic), "refreshing", "error"}, pending: 키 → Future.
+    gen/gens: 전체/키 첫 요소(prefix)별 clear 횟수."""
+    return {"lock": threading.Lock(), "entries": OrderedDict(), "pending": {}, "max_entries": max_entries,
+            "stats": defaultdict(int), "gen": 0, "gens": defaultdict(int)}
+
+
+def freeze(obj):
+    """인자 → 해시 가능한 키 (dict는 정렬된 항목, list/set은 tuple)."""
+    if isinstance(obj, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in obj.items()))
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(v) for v in obj)
+    if isinstance(obj, (set, frozenset)):
+        return tuple(sorted(freeze(v) for v in obj))
+    return obj
+
+
+def _gen(cache: dict, key) -> tuple[int, int]:
+    """key가 속한 세대. 조회 시작 때 잡아 두고 저장 직전에 비교 (lock 안에서 호출)."""
+    return cache["gen"], cache["gens"][key[0]]
+
+
+def _store(cache: dict, key, value):
+    entries = cache["entries"]
+    entries[key] = {"value": value, "at": time.monotonic(), "refreshing": False, "error": None}
+    entries.move_to_end(key)
+    while len(entries) > cache["max_entries"]:
+        entries.popitem(last=False)
+
+
+def get(cache: dict, key, load, ttl: float, max_stale: float | None = None, refresh=None):
+    """key의 결과. load()는 실제 조회, refresh(fn)는 fn을 백그라운드로 실행 (None이면 stale도 직접 조회).
+    max_stale=None이면 오래된 결과도 계속 stale로 제공."""
+    with cache["lock"]:
+        gen = _gen(cache, key)
+        entry = cache["entries"].get(key)
+        age = time.monotonic() - entry["at"] if entry else None
+        if entry and age < ttl:
+            cache["entries"].move_to_end(key)
+            cache["stats"]["hits"] += 1
+            return entry["value"]
+        if entry and refresh is not None and (max_stale is None or age < max_stale):
+            cache["entries"].move_to_end(key)
+            cache["stats"]["stale"] += 1
+            value, start = entry["value"], not entry["refreshing"]
+            if start:
+                entry["refreshing"] = True
+                cache["stats"]["refreshes"] += 1
+            fut = None
+        else:
+            fut, owner = cache["pending"].get(key), False
+            if fut is None:
+                fut, owner = cache["pending"].setdefault(key, Future()), True
+                cache["stats"]["misses"] += 1
+            else:
+                cache["stats"]["coalesced"] += 1
+    if fut is not None:
+        # 직접 조회하거나, 다른 스레드가 조회 중이면 같은 결과(예외면 같은 예외)를 기다림
+        return _load(cache, key, load, fut, gen) if owner else fut.result()
+    if start:
+        try:
+            refresh(lambda: _refresh(cache, key, load, gen))
+        except Exception:
+            with cache["lock"]:
+                entry["refreshing"] = False
+    return value
+
+
+def _load(cache: dict, key, load, fut: Future, gen):
+    try:
+        value = load()
+    except BaseException as e:
+        with cache["lock"]:
+            if cache["pending"].get(key) is fut:
+                del cache["pending"][key]
+            cache["stats"]["errors"] += 1
+        fut.set_exception(e)
+        raise
+    with cache["lock"]:
+        if _gen(cache, key) == gen:   # 조회 중 clear됐으면 기다리던 요청에만 돌려주고 저장하지 않음
+            _store(cache, key, value)
+        if cache["pending"].get(key) is fut:
+            del cache["pending"][key]
+    fut.set_result(value)
+    return value
+
+
+def _refresh(cache: dict, key, load, gen):
+    value, error = None, "갱신 중단"
+    try:
+        value = load()
+        error = None
+    except Exception as e:
+        error = str(e)
+    finally:   # 어떤 예외로 끝나도 refreshing 해제 (안 풀면 그 키는 다시 갱신되지 않음)
+        with cache["lock"]:
+            if error is not None:
+                cache["stats"]["errors"] += 1
+            if _gen(cache, key) == gen:   # clear 이후면 결과/상태 모두 버림 (새 항목은 건드리지 않음)
+                entry = cache["entries"].get(key)
+                if error is None:
+                    _store(cache, key, value)
+                elif entry is not None:
+                    entry["refreshing"], entry["error"] = False, error   # 직전 결과 유지, 다음 요청에서 재시도
+
+
+def clear(cache: dict, prefix=None):
+    """전체 또는 키 첫 요소가 prefix인 항목 삭제. 세대를 올려 진행 중인 조회/갱신 결과는 저장하지 않고,
+    이후 요청은 진행 중인 조회를 기다리지 않고 새로 조회."""
+    with cache["lock"]:
+        if prefix is None:
+            cache["gen"] += 1
+            cache["entries"].clear()
+            cache["pending"].clear()
+        else:
+            cache["gens"][prefix] += 1
+            for d in (cache["entries"], cache["pending"]):
+                for k in [k for k in d if k[0] == prefix]:
+                    del d[k]
+
+
+def cache_stats(cache: dict) -> dict:
+    with cache["lock"]:
+        stats = {k: cache["stats"][k] for k in STAT_KEYS}
+        stats["entries"] = len(cache["entries"])
+        stats["refreshing"] = sum(e["refreshing"] for e in cache["entries"].values())
+        stats["last_error"] = next((e["error"] for e in reversed(cache["entries"].values()) if e["error"]), None)
+    return stats